@@ -24,9 +24,10 @@ class RandomMover:
         return ("noop", {}) #no valid moves
 
 #controls game setup, turns, and win con
+# board_cls selects the board backend, BitBoardState can be passed in place of the default BoardState
 class GameManager:
-    def __init__(self):
-        self.board = BoardState(size=9)
+    def __init__(self, board_cls=BoardState):
+        self.board = board_cls(size=9)
 
         #placing players
         mid_col = self.board.size // 2
@@ -44,10 +45,11 @@ class GameManager:
         else:
             return player.Y == 0
 
-    #main game loop
-    def play_game(self, max_turns=50):
+    #main game loop; a position (including whose turn it is) that occurs repetition_limit times ends the game in a draw
+    def play_game(self, max_turns=50, repetition_limit=3):
         print("\n=== Starting Game ===")
         visualize_path(self.board, None)
+        seen = {self.board.zobrist: 1}
 
         for turn in range(max_turns):
             print(f"\n--- Turn {turn + 1} ---")
@@ -60,16 +62,17 @@ class GameManager:
                 action, params = agent.choose_action(self.board)
                 print(f"[Turn {turn + 1}] Player {agent.player_num} chose action: {action}, {params}")
 
-                #executing chosen actions
+                #executing chosen actions; push keeps the side to move (and so the position hash) in step with the game
+                if not self.board.push((action, params), agent.player_num):
+                    print(f"[Turn {turn + 1}] Player {agent.player_num} wall placement failed, turn passes")
+                    self.board.push(("noop", {}), agent.player_num)
+
+                seen[self.board.zobrist] = seen.get(self.board.zobrist, 0) + 1
+                if seen[self.board.zobrist] >= repetition_limit:
+                    print(f"\n Game drawn by repetition after turn {turn + 1}.")
+                    return
                 if action == "noop":
                     continue
-                elif action == "move":
-                    self.board.move_player(agent.player_num, params["direction"])
-                elif action == "move_jumpaware":
-                    y, x = params["target"]
-                    self.board.teleport_player(agent.player_num, y, x)
-                elif action == "wall":
-                    self.board.place_wall(params["corner1"], params["corner2"], params["direction"])
 
                 # This is a crude visualizer for the board state
                 # using some logic from my testing functionality
@@ -1,4 +1,5 @@
 from astarpathfinding import a_star_path
+from distanceField import wall_effects
 import random
 
 class AStarAgent:
@@ -7,37 +8,37 @@ class AStarAgent:
         self.opponent_num = 2 if player_num == 1 else 1
 
     def choose_action(self, board_state):
-        my_path = a_star_path(board_state, self.player_num)
-        opp_path = a_star_path(board_state, self.opponent_num)
+        # Path lengths come from the board's cached goal-distance maps, which only change when a wall is placed
+        my_len = board_state.goal_distance(self.player_num)
+        opp_len = board_state.goal_distance(self.opponent_num)
 
-        if not my_path or not opp_path:
+        if my_len is None or opp_len is None:
             return ("move", {"direction": 2})
-        
-        my_len = len(my_path)
-        opp_len = len(opp_path)
 
         if my_len <= opp_len:
-            if len(my_path) < 2:
+            if my_len == 0:
                 print("[AStarAgent] Already at goal or no move needed.")
                 return ("noop", {})
-            next_pos = my_path[1]
-            return ("move_jumpaware", {"target": next_pos})
+            return self.move_action(board_state)
         else:
-            if len(opp_path) > 2:
-                block_pos = opp_path[1]
-                r, c = block_pos
-
-                # Try both wall directions and return the first valid placement
-                wall_attempts = [
-                    (0, (r, c), (r + 1, c + 1)),  # Horizontal
-                    (1, (r, c), (r + 1, c + 1))   # Vertical
-                ]
+            if opp_len > 1:
+                # Every legal wall's effect on both path lengths comes from one batched flood fill (see distanceField.wall_effects);
+                # take the wall that delays the opponent most compared to how much it delays us, if any wall gains anything
+                def gain(lengths):
+                    return (lengths[self.opponent_num - 1] - opp_len) - (lengths[self.player_num - 1] - my_len)
 
-                for direction, corner1, corner2 in wall_attempts:
-                    # Make sure corners are within bounds
-                    if corner2[0] < board_state.size and corner2[1] < board_state.size:
-                        if board_state.place_wall(corner1, corner2, direction):
-                            return ("wall", {"corner1": corner1, "corner2": corner2, "direction": direction})
+                effects = wall_effects(board_state)
+                best = max(effects, key=lambda wall: gain(effects[wall]), default=None)
+                if best is not None and gain(effects[best]) > 0:
+                    corner1, corner2, direction = best
+                    return ("wall", {"corner1": corner1, "corner2": corner2, "direction": direction})
 
             # Fall back to moving if wall can't be placed
-            return ("move_jumpaware", {"target": my_path[1]})
\ No newline at end of file
+            return self.move_action(board_state)
+
+    # the actual step to take; a_star_path is still used here because it knows how to jump over the opponent
+    def move_action(self, board_state):
+        my_path = a_star_path(board_state, self.player_num)
+        if not my_path or len(my_path) < 2:
+            return ("move", {"direction": 2})
+        return ("move_jumpaware", {"target": my_path[1]})
@@ -0,0 +1,119 @@
+import multiprocessing
+import queue
+from boardState import BoardState
+
+# --------------------------------------------------------------
+# Runs an agent's choose_action in a separate process, so the caller (the pygame UI) keeps drawing and handling input while it thinks.
+# The agent is built once inside the worker and kept between moves, so agents that carry state from turn to turn (MCTSAgent's tree,
+# AlphaBetaAgent's transposition table) work the same as in-process. Boards are sent as BoardState.serialize() tuples.
+#
+#   worker = AgentWorker(AStarAgent, 2)
+#   worker.request_action(board)    # returns at once
+#   action = worker.poll()          # None until the action is ready, then the action (once)
+#   worker.cancel()                 # drops the request; a search in progress is stopped by ending the process
+#   worker.close()
+#
+# A process rather than a thread, since a search cannot be interrupted inside a thread and would hold the GIL against the UI.
+# Cancelling throws away the agent along with the process; a new one is started with the next request.
+#
+# Pondering: between requests, an agent with a ponder(board, time_limit_ms) method (MCTSAgent) keeps searching on the position after
+# its own move while the other player thinks, in slices of PONDER_SLICE_MS so a new request is picked up almost at once, for at most
+# ponder_ms in total per move. The next choose_action then reuses that work.
+# --------------------------------------------------------------
+
+PONDER_SLICE_MS = 50
+
+# the worker process: builds the agent, then answers every (request_id, board data) with (request_id, action) until it gets None,
+# pondering on the position after its answer while it waits for the next request
+def serve(agent_cls, agent_args, agent_kwargs, ponder_ms, requests, results):
+    agent = agent_cls(*agent_args, **agent_kwargs)
+    board = None
+    pondered = 0
+    while True:
+        try:
+            message = requests.get_nowait()
+        except queue.Empty:
+            if board is not None and pondered < ponder_ms and agent.ponder(board, min(PONDER_SLICE_MS, ponder_ms - pondered)):
+                pondered += PONDER_SLICE_MS
+                continue
+            message = requests.get()
+        if message is None:
+            break
+        request_id, data = message
+        board = BoardState.from_serialized(data)
+        action = agent.choose_action(board)
+        results.put((request_id, action))
+
+        # the position the opponent now has to answer, if the agent can ponder on it
+        if hasattr(agent, "ponder") and ponder_ms and board.push(action, agent.player_num):
+            pondered = 0
+        else:
+            board = None
+
+class AgentWorker:
+    def __init__(self, agent_cls, *agent_args, ponder_ms=30000, **agent_kwargs):
+        self.agent_cls = agent_cls
+        self.agent_args = agent_args
+        self.agent_kwargs = agent_kwargs
+        self.ponder_ms = ponder_ms # pondering time per move for agents that support it; 0 turns pondering off
+        self.context = multiprocessing.get_context("spawn") # a fresh interpreter, so the worker does not inherit the UI's pygame/SDL state
+        self.process = None
+        self.request_id = 0
+        self.pending = None # id of the request whose action has not been collected yet
+
+    # starts the worker process if it is not running; called by request_action, or early to hide the start-up time
+    def start(self):
+        if self.process is None:
+            self.requests = self.context.Queue()
+            self.results = self.context.Queue()
+            self.process = self.context.Process(target=serve, args=(self.agent_cls, self.agent_args, self.agent_kwargs, self.ponder_ms, self.requests, self.results),
+                                                daemon=True)
+            self.process.start()
+
+    # asks for the agent's action on (a snapshot of) the board; any request still pending is replaced
+    def request_action(self, board):
+        if self.pending is not None:
+            self.cancel()
+        self.start()
+        self.request_id += 1
+        self.pending = self.request_id
+        self.requests.put((self.request_id, board.serialize()))
+
+    # whether an action was requested and not collected yet
+    @property
+    def thinking(self):
+        return self.pending is not None
+
+    # the requested action if it is ready, otherwise None; answers to cancelled requests are skipped
+    def poll(self):
+        while self.pending is not None:
+            try:
+                request_id, action = self.results.get_nowait()
+            except queue.Empty:
+                if not self.process.is_alive():
+                    raise RuntimeError(f"agent worker exited with code {self.process.exitcode}")
+                return None
+            if request_id == self.pending:
+                self.pending = None
+                return action
+        return None
+
+    # drops the pending request; if the agent is still working on it, the process is ended rather than left searching
+    def cancel(self):
+        if self.pending is not None:
+            self.pending = None
+            self.stop()
+
+    def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join()
+            self.process = None
+
+    # stops the worker; a worker waiting for requests is asked to exit, a busy one is ended
+    def close(self):
+        if self.process is not None and self.pending is None:
+            self.requests.put(None)
+            self.process.join(timeout=1)
+        self.pending = None
+        self.stop()
@@ -0,0 +1,298 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from boardState import BoardState
+from pawnMoves import STEPS
+
+WIN_SCORE = 1000 # score of a won position, well above any difference in path lengths
+EXACT, LOWER, UPPER = 0, 1, 2 # what a transposition table score means: the exact value, a lower bound (beta cutoff) or an upper bound (fail low)
+
+# raised inside the search once the time budget runs out; choose_action catches it and unwinds the board
+class SearchTimeout(Exception):
+    pass
+
+# a fixed-size transposition table keyed by the board's Zobrist hash
+# each hash maps to one slot (hash % size); a slot is overwritten when it is empty, holds an entry from an older search,
+# or holds an entry searched no deeper than the new one, so deep results from the current search survive shallow ones
+class TranspositionTable:
+    def __init__(self, size=1 << 16):
+        self.size = size
+        self.slots = [None] * size
+        self.generation = 0
+
+    # called once per search so entries left by earlier searches become the first to be replaced
+    def new_search(self):
+        self.generation += 1
+
+    # returns (depth, score, flag, move) stored for the hash, or None
+    def probe(self, key):
+        entry = self.slots[key % self.size]
+        if entry is not None and entry[0] == key:
+            return entry[2:6]
+        return None
+
+    def store(self, key, depth, score, flag, move):
+        index = key % self.size
+        old = self.slots[index]
+        if old is None or old[1] != self.generation or depth >= old[2]:
+            self.slots[index] = (key, self.generation, depth, score, flag, move)
+
+
+# --------------------------------------------------------------
+# Negamax search with alpha-beta pruning over the board's push/pop undo stack.
+# Positions are scored as (opponent's goal distance - own goal distance) from the side to move, using the board's cached distance maps.
+# Moves are tried in the order: transposition table move, pawn moves (shortest path first), then walls along the opponent's shortest path.
+# --------------------------------------------------------------
+class AlphaBetaAgent:
+    # depth is the number of plies searched; wall_reach is how many steps of the opponent's shortest path are considered for walls
+    # with time_limit_ms set, the search instead deepens one ply at a time (up to max_depth) until the budget is used up,
+    # and plays the best move of the deepest search that finished
+    # with workers > 1 the root moves are dealt out to a pool of worker processes (root parallelism), each searching its share with
+    # its own transposition table; the board is sent as BoardState.serialize() output
+    def __init__(self, player_num, depth=2, wall_reach=4, tt_size=1 << 16, time_limit_ms=None, max_depth=32, workers=1):
+        self.player_num = player_num
+        self.opponent_num = 2 if player_num == 1 else 1
+        self.depth = depth
+        self.wall_reach = wall_reach
+        self.tt = TranspositionTable(tt_size)
+        self.time_limit_ms = time_limit_ms
+        self.max_depth = max_depth
+        self.deadline = None
+        self.nodes = 0
+        self.workers = workers
+        self.pool = None # created on first use, see executor
+        self.last_search = None # {"depth", "nodes", "time_ms", "score"} of the latest choose_action call
+
+    def choose_action(self, board_state):
+        if self.workers > 1:
+            return self.choose_root_parallel(board_state)
+        self.tt.new_search()
+        self.nodes = 0
+        start = time.perf_counter()
+        turn = board_state.turn
+        history = len(board_state.history)
+        board_state.set_turn(self.player_num) # callers that move pawns directly leave the side to move behind, and it is part of the hash
+
+        if self.time_limit_ms is None:
+            depths = [self.depth]
+        else:
+            self.deadline = start + self.time_limit_ms / 1000
+            depths = range(1, self.max_depth + 1)
+
+        completed, score, action = 0, None, None
+        try:
+            for depth in depths:
+                score, action = self.search(board_state, self.player_num, depth, -WIN_SCORE * 2, WIN_SCORE * 2)
+                completed = depth
+                if abs(score) >= WIN_SCORE: # the result is decided, searching deeper cannot change it
+                    break
+        except SearchTimeout:
+            while len(board_state.history) > history:
+                board_state.pop()
+        finally:
+            self.deadline = None
+        board_state.set_turn(turn)
+
+        if completed == 0: # not even one ply finished in time; play the first move the ordering would have tried
+            actions = self.ordered_actions(board_state, self.player_num)
+            action = actions[0] if actions else None
+        self.last_search = {"depth": completed, "nodes": self.nodes, "time_ms": (time.perf_counter() - start) * 1000, "score": score}
+        if action is None:
+            return ("noop", {})
+        return action
+
+    # root parallelism: the root moves are split round-robin between the workers, each worker deepens over its own share,
+    # and the best move is taken from the deepest depth that every worker finished
+    def choose_root_parallel(self, board_state):
+        start = time.perf_counter()
+        turn = board_state.turn
+        board_state.set_turn(self.player_num)
+        data = board_state.serialize()
+        actions = self.ordered_actions(board_state, self.player_num)
+        board_state.set_turn(turn)
+        shares = [actions[i::self.workers] for i in range(self.workers) if actions[i::self.workers]]
+
+        nodes, finished = 0, []
+        for worker_nodes, by_depth in self.executor().map(search_actions_in_worker, repeat(data), repeat(self.player_num), repeat(self.settings()), shares):
+            nodes += worker_nodes
+            finished.append(by_depth)
+        depth = min((max(by_depth) if by_depth else 0) for by_depth in finished) if finished else 0
+
+        score, action = None, None
+        if depth > 0:
+            for by_depth in finished:
+                for move_score, move in by_depth[depth]:
+                    if score is None or move_score > score:
+                        score, action = move_score, move
+        elif actions:
+            action = actions[0]
+        self.last_search = {"depth": depth, "nodes": nodes, "time_ms": (time.perf_counter() - start) * 1000, "score": score}
+        if action is None:
+            return ("noop", {})
+        return action
+
+    # searches only the given root actions, deepening like choose_action; returns {depth: [(score, action), ...]} for every finished depth
+    # scores are exact for the best action of each depth and upper bounds for the others, which is all the caller needs to pick the best
+    def search_actions(self, board_state, actions):
+        self.tt.new_search()
+        self.nodes = 0
+        board_state.set_turn(self.player_num)
+        history = len(board_state.history)
+        if self.time_limit_ms is None:
+            depths = [self.depth]
+        else:
+            self.deadline = time.perf_counter() + self.time_limit_ms / 1000
+            depths = range(1, self.max_depth + 1)
+
+        finished = {}
+        try:
+            for depth in depths:
+                results, alpha = [], -WIN_SCORE * 2
+                for action in actions:
+                    if not board_state.push(action, self.player_num):
+                        continue
+                    score = -self.search(board_state, self.opponent_num, depth - 1, -WIN_SCORE * 2, -alpha)[0]
+                    board_state.pop()
+                    results.append((score, action))
+                    alpha = max(alpha, score)
+                finished[depth] = results
+                if abs(alpha) >= WIN_SCORE:
+                    break
+        except SearchTimeout:
+            while len(board_state.history) > history:
+                board_state.pop()
+        finally:
+            self.deadline = None
+        return finished
+
+    # the constructor arguments a worker process needs to search the same way as this agent
+    def settings(self):
+        return {"depth": self.depth, "wall_reach": self.wall_reach, "tt_size": self.tt.size,
+                "time_limit_ms": self.time_limit_ms, "max_depth": self.max_depth}
+
+    def executor(self):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self.pool
+
+    # shuts down the worker processes, if any were started
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    # returns (score, best action) for player to move, searching depth more plies
+    def search(self, board_state, player_num, depth, alpha, beta):
+        self.nodes += 1
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        opponent_num = 2 if player_num == 1 else 1
+        if self.at_goal(board_state, opponent_num):
+            return -WIN_SCORE - depth, None # losing later is better than losing now
+        if self.at_goal(board_state, player_num):
+            return WIN_SCORE + depth, None
+        if depth == 0:
+            return self.evaluate(board_state, player_num), None
+
+        key = board_state.zobrist
+        alpha_start = alpha
+        best_move = None
+        entry = self.tt.probe(key)
+        if entry is not None:
+            entry_depth, entry_score, flag, best_move = entry
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return entry_score, best_move
+                if flag == LOWER:
+                    alpha = max(alpha, entry_score)
+                else:
+                    beta = min(beta, entry_score)
+                if alpha >= beta:
+                    return entry_score, best_move
+
+        best_score, best_action = None, None
+        for action in self.ordered_actions(board_state, player_num, best_move):
+            if not board_state.push(action, player_num):
+                continue
+            score = -self.search(board_state, opponent_num, depth - 1, -beta, -alpha)[0]
+            board_state.pop()
+            if best_score is None or score > best_score:
+                best_score, best_action = score, action
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if best_action is None: # nothing to play, so the position is scored as it stands
+            return self.evaluate(board_state, player_num), None
+        if best_score <= alpha_start:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.store(key, depth, best_score, flag, best_action)
+        return best_score, best_action
+
+    def at_goal(self, board_state, player_num):
+        return board_state.players[player_num - 1].Y == board_state.goal_row(player_num)
+
+    # path length difference from the side to move's point of view; a walled-off player counts as losing
+    def evaluate(self, board_state, player_num):
+        opponent_num = 2 if player_num == 1 else 1
+        mine = board_state.goal_distance(player_num)
+        theirs = board_state.goal_distance(opponent_num)
+        if mine is None:
+            return -WIN_SCORE
+        if theirs is None:
+            return WIN_SCORE
+        return theirs - mine
+
+    # every action to search from this position, best guesses first
+    def ordered_actions(self, board_state, player_num, tt_move=None):
+        actions = candidate_actions(board_state, player_num, self.wall_reach)
+        if tt_move is not None and tt_move in actions:
+            actions.remove(tt_move)
+            actions.insert(0, tt_move)
+        return actions
+
+
+# worker process side of root parallelism: returns (nodes searched, search_actions output) for the given share of the root moves
+def search_actions_in_worker(data, player_num, settings, actions):
+    agent = AlphaBetaAgent(player_num, **settings)
+    finished = agent.search_actions(BoardState.from_serialized(data), actions)
+    return agent.nodes, finished
+
+# the actions worth searching for player_num, best guesses first: pawn moves sorted by distance to goal,
+# then legal walls whose 2x2 block touches the first wall_reach steps of the opponent's shortest path, in path order
+# shared by the search agents (AlphaBetaAgent, MCTSAgent)
+def candidate_actions(board_state, player_num, wall_reach=4):
+    opponent_num = 2 if player_num == 1 else 1
+    dist = board_state.distance_map(player_num)
+    moves = board_state.legal_pawn_moves(player_num)
+    moves.sort(key=lambda pos: dist[pos[0]][pos[1]] if dist[pos[0]][pos[1]] is not None else board_state.size ** 2)
+    actions = [("move_jumpaware", {"target": pos}) for pos in moves]
+
+    order = {}
+    for i, (y, x) in enumerate(shortest_path(board_state, opponent_num)[:wall_reach + 1]):
+        for r in (y - 1, y):
+            for c in (x - 1, x):
+                order.setdefault((r, c), i)
+    walls = [w for w in board_state.legal_walls() if w[0] in order]
+    walls.sort(key=lambda w: order[w[0]])
+    actions += [("wall", {"corner1": c1, "corner2": c2, "direction": d}) for c1, c2, d in walls]
+    return actions
+
+# the spaces of one shortest path (ignoring pawns) from the player's pawn to its goal row, following the distance map downhill
+def shortest_path(board_state, player_num):
+    dist = board_state.distance_map(player_num)
+    player = board_state.players[player_num - 1]
+    y, x = player.Y, player.X
+    path = [(y, x)]
+    while dist[y][x]:
+        walls = board_state.board[y][x].get_walls()
+        for d, (dy, dx) in enumerate(STEPS):
+            if not walls[d] and dist[y + dy][x + dx] == dist[y][x] - 1:
+                y, x = y + dy, x + dx
+                break
+        path.append((y, x))
+    return path
@@ -0,0 +1,252 @@
+import argparse
+import time
+import numpy as np
+from pawnMoves import STEPS
+from distanceField import UNREACHED, empty_open, distance_fields, wall_tables
+from boardState import BoardState
+
+# --------------------------------------------------------------
+# Batch self-play: plays many games at once, stored as stacked NumPy arrays instead of one BoardState per game,
+# and advances every unfinished game by one ply per step, so the per-move work is a few array operations over the whole batch.
+#
+#   ARRAYS (g is the game, n the board size, m = n-1):
+#       - open[g, d, y, x]: the pawn on (y,x) can step in direction d ([N,E,S,W]); the outside edges are closed
+#       - walls[g, s]: wall slot s holds a placed wall, s = direction*m*m + r*m + c like BoardState.slot_index (walls.reshape(N, 2, m, m) gives the wall planes)
+#       - free[g, s]: wall slot s can still take a wall, i.e. neither it nor an overlapping slot holds one
+#       - pawns[g, p]: (y, x) of player p+1; turn[g]: index (0 or 1) of the player to move
+#       - done[g], winner[g] (0 for a draw or an unfinished game), plies[g], walls_left[g, p]
+#
+# Pawn moves follow the same rules as pawnMoves.pawn_moves (jumps and sidesteps), as a mask over the 12 squares a pawn can reach.
+# A wall is only placed if both players still have a path afterwards, checked with one flood fill over the whole batch (distanceField.distance_fields).
+#
+# Policies, per player:
+#   - "random": a uniformly random legal pawn move, like RandomMover
+#   - "greedy": a step along the shortest path to the goal row (ties broken at random), like BFSAgent
+# With wall_chance > 0, a player with walls left places a wall on a random free slot that often instead of moving.
+#
+# From the command line:
+#   python batchSimulator.py --games 100000 --policies greedy random --wall-chance 0.1
+#   python batchSimulator.py --check --wall-chance 0.2      # checks to_board, including pawns on each other's squares
+# --------------------------------------------------------------
+
+POLICIES = ("random", "greedy")
+
+# the squares a pawn can reach, relative to it: 4 steps, 4 straight jumps over the other pawn, then 4 diagonal sidesteps (NE, SE, SW, NW)
+MOVE_OFFSETS = np.array(STEPS + [(2 * dy, 2 * dx) for dy, dx in STEPS] + [(-1, 1), (1, 1), (1, -1), (-1, -1)])
+DIAGONALS = {(-1, 1): 8, (1, 1): 9, (1, -1): 10, (-1, -1): 11}
+
+class BatchSimulator:
+    def __init__(self, games, size=9, policies=("greedy", "greedy"), wall_chance=0.0, walls_per_player=10, max_turns=150,
+                 random_start=True, seed=None):
+        for policy in policies:
+            if policy not in POLICIES:
+                raise ValueError(f"unknown policy {policy!r}, expected one of {POLICIES}")
+        self.games = games
+        self.size = size
+        self.policies = policies
+        self.wall_chance = wall_chance
+        self.walls_per_player = walls_per_player
+        self.max_turns = max_turns # per player, like tournament.play_game; games still running after that are draws
+        self.rng = np.random.default_rng(seed)
+        self.closes, self.overlaps = wall_tables(size)
+        self.goal_rows = np.array([size - 1, 0]) # player 1 heads south, player 2 north
+
+        m = size - 1
+        self.open = empty_open(games, size)
+        self.walls = np.zeros((games, 2 * m * m), dtype=bool)
+        self.free = np.ones((games, 2 * m * m), dtype=bool)
+        self.pawns = np.empty((games, 2, 2), dtype=np.int64)
+        self.pawns[:, 0, 0] = 0
+        self.pawns[:, 1, 0] = size - 1
+        if random_start: # starting columns randomized like in the test scripts and tournament.py
+            self.pawns[:, :, 1] = self.rng.integers(size, size=(games, 2))
+        else:
+            self.pawns[:, :, 1] = size // 2
+        self.turn = np.zeros(games, dtype=np.int64)
+        self.done = np.zeros(games, dtype=bool)
+        self.winner = np.zeros(games, dtype=np.int8)
+        self.plies = np.zeros(games, dtype=np.int64)
+        self.walls_left = np.full((games, 2), walls_per_player, dtype=np.int64)
+
+    # plays every game to the end; returns self.results()
+    def run(self):
+        while not self.done.all():
+            self.step()
+        return self.results()
+
+    # one ply in every unfinished game: walls where the wall policy fires and a legal wall is found, pawn moves everywhere else
+    def step(self):
+        active = np.flatnonzero(~self.done)
+        moving = np.ones(len(active), dtype=bool)
+        if self.wall_chance > 0:
+            moving[self.place_walls(active)] = False
+        self.move_pawns(active[moving])
+
+        self.turn[active] ^= 1
+        self.plies[active] += 1
+        self.done[active[self.plies[active] >= 2 * self.max_turns]] = True
+
+    # tries a wall on a random free slot in the games (indices into self) whose player draws one; returns the positions in games that placed a wall
+    def place_walls(self, games):
+        player = self.turn[games]
+        tries = (self.rng.random(len(games)) < self.wall_chance) & (self.walls_left[games, player] > 0) & self.free[games].any(axis=1)
+        picked = np.flatnonzero(tries)
+        if len(picked) == 0:
+            return picked
+        g = games[picked]
+        slots = np.argmax(self.rng.random((len(g), self.free.shape[1])) * self.free[g], axis=1)
+
+        # the wall stays only if both pawns can still reach their goal rows, checked for both players of every game in one flood fill
+        open = self.open[g]
+        cells = self.closes[slots]
+        open[np.arange(len(g))[:, None], cells[..., 0], cells[..., 1], cells[..., 2]] = False
+        dist = distance_fields(np.concatenate([open, open]), np.repeat(self.goal_rows, len(g)))
+        rows = np.concatenate([self.pawns[g, 0, 0], self.pawns[g, 1, 0]])
+        cols = np.concatenate([self.pawns[g, 0, 1], self.pawns[g, 1, 1]])
+        reachable = (dist[np.arange(2 * len(g)), rows, cols] != UNREACHED).reshape(2, len(g)).all(axis=0)
+
+        g, slots = g[reachable], slots[reachable]
+        self.open[g] = open[reachable]
+        self.walls[g, slots] = True
+        self.free[g[:, None], self.overlaps[slots]] = False
+        self.walls_left[g, self.turn[g]] -= 1
+        return picked[reachable]
+
+    # for each of the games, a (12,) mask of the MOVE_OFFSETS the player to move may take
+    def move_mask(self, games):
+        open = self.open[games]
+        me = self.pawns[games, self.turn[games]]
+        other = self.pawns[games, 1 - self.turn[games]]
+        rows = np.arange(len(games))
+        mask = np.zeros((len(games), len(MOVE_OFFSETS)), dtype=bool)
+        for d, (dy, dx) in enumerate(STEPS):
+            can = open[rows, d, me[:, 0], me[:, 1]]
+            ty = np.clip(me[:, 0] + dy, 0, self.size - 1)
+            tx = np.clip(me[:, 1] + dx, 0, self.size - 1)
+            onto_pawn = can & (ty == other[:, 0]) & (tx == other[:, 1])
+            mask[:, d] = can & ~onto_pawn
+            jump = onto_pawn & open[rows, d, ty, tx]
+            mask[:, 4 + d] = jump
+            blocked_behind = onto_pawn & ~jump
+            for side in ((d + 1) % 4, (d + 3) % 4):
+                sy, sx = STEPS[side]
+                mask[:, DIAGONALS[(dy + sy, dx + sx)]] |= blocked_behind & open[rows, side, ty, tx]
+        return mask
+
+    # moves the pawn of the player to move in each of the games, following that player's policy; ends the games that reach a goal row
+    def move_pawns(self, games):
+        if len(games) == 0:
+            return
+        player = self.turn[games]
+        me = self.pawns[games, player]
+        mask = self.move_mask(games)
+        targets = me[:, None, :] + MOVE_OFFSETS[None, :, :]
+        score = self.rng.random(mask.shape) # random tie-break, and the whole choice for the random policy
+
+        greedy = np.isin(player, [i for i, policy in enumerate(self.policies) if policy == "greedy"])
+        if greedy.any():
+            g = games[greedy]
+            dist = distance_fields(self.open[g], self.goal_rows[player[greedy]])
+            ty = np.clip(targets[greedy, :, 0], 0, self.size - 1)
+            tx = np.clip(targets[greedy, :, 1], 0, self.size - 1)
+            score[greedy] -= dist[np.arange(len(g))[:, None], ty, tx]
+
+        score[~mask] = -np.inf
+        choice = np.argmax(score, axis=1)
+        can_move = mask.any(axis=1) # a pawn boxed in by walls and the other pawn passes
+        g, player, choice = games[can_move], player[can_move], choice[can_move]
+        self.pawns[g, player] = targets[can_move, choice]
+
+        arrived = self.pawns[g, player, 0] == self.goal_rows[player]
+        self.done[g[arrived]] = True
+        self.winner[g[arrived]] = player[arrived] + 1
+
+    # winner (1, 2, or 0 for a draw), turns (completed rounds, like tournament.play_game) and walls placed per player, one entry per game
+    def results(self):
+        return {
+            "winner": self.winner.copy(),
+            "turns": self.plies // 2,
+            "walls_placed": self.walls_per_player - self.walls_left,
+        }
+
+    # game g as a BoardState, e.g. to look at a position or hand it to an agent; built with BoardState.from_serialized, which marks both
+    # pawns' squares again after moving them (a pawn can end up on the other's starting square)
+    def to_board(self, g):
+        m = self.size - 1
+        pawns = tuple((int(y), int(x)) for y, x in self.pawns[g])
+        walls = tuple((int(s % (m * m) // m), int(s % m), int(s // (m * m))) for s in np.flatnonzero(self.walls[g]))
+        return BoardState.from_serialized((self.size, pawns, walls, int(self.turn[g]) + 1))
+
+# checks to_board on finished games and on pawns moved onto each other's squares (swapped, and pawn 1 on pawn 2's start):
+# every pawn's square must say it holds that pawn, and no other square may hold one; returns the problems found
+def check_to_board(sim):
+    games = list(range(min(sim.games, 100)))
+    if sim.games >= 2:
+        n = sim.size
+        sim.pawns[0] = [(n - 1, n // 2), (0, n // 2)]
+        sim.pawns[1] = [(n - 1, n // 2), (n // 2, 0)]
+    problems = []
+    for g in games:
+        board = sim.to_board(g)
+        marked = {s.pos: s.player for s in board.board.flat if s.player is not None}
+        expected = {(p.Y, p.X): p.PlayerNo for p in board.players}
+        if marked != expected or [(p.Y, p.X) for p in board.players] != [tuple(pawn) for pawn in sim.pawns[g].tolist()]:
+            problems.append((g, sim.pawns[g].tolist(), marked))
+    return problems
+
+# win rates and game lengths over simulator results
+def summarize(results):
+    winner = results["winner"]
+    total = len(winner)
+    decided = results["turns"][winner != 0]
+    summary = {"games": total, "draws": int((winner == 0).sum())}
+    summary["draw_rate"] = summary["draws"] / total if total else 0.0
+    summary["average_turns"] = float(decided.mean()) if len(decided) else None
+    summary["average_walls"] = float(results["walls_placed"].sum(axis=1).mean()) if total else None
+    for player_num in (1, 2):
+        wins = int((winner == player_num).sum())
+        summary[f"player{player_num}"] = {"wins": wins, "win_rate": wins / total if total else 0.0}
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play many games at once with vectorized policies")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--batch", type=int, default=10000, help="games simulated together; bounds memory use")
+    parser.add_argument("--size", type=int, default=9)
+    parser.add_argument("--policies", nargs=2, choices=POLICIES, default=["greedy", "greedy"])
+    parser.add_argument("--wall-chance", type=float, default=0.0)
+    parser.add_argument("--max-turns", type=int, default=150)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", action="store_true", help="check to_board against the simulator's positions and exit")
+    args = parser.parse_args()
+
+    if args.check:
+        sim = BatchSimulator(min(args.games, 100), args.size, tuple(args.policies), args.wall_chance, max_turns=args.max_turns, seed=args.seed)
+        sim.run()
+        problems = check_to_board(sim)
+        for g, pawns, marked in problems:
+            print(f"[MISMATCH] game {g}: pawns {pawns}, marked squares {marked}")
+        print(f"to_board checked on {min(sim.games, 100)} games, {len(problems)} mismatches")
+        raise SystemExit(1 if problems else 0)
+
+    start = time.time()
+    rng = np.random.default_rng(args.seed)
+    batches = []
+    for first in range(0, args.games, args.batch):
+        sim = BatchSimulator(min(args.batch, args.games - first), args.size, tuple(args.policies), args.wall_chance,
+                             max_turns=args.max_turns, seed=rng.integers(2 ** 63))
+        batches.append(sim.run())
+    results = {key: np.concatenate([batch[key] for batch in batches]) for key in batches[0]}
+    elapsed = time.time() - start
+
+    summary = summarize(results)
+    print(f"\n--- Summary ---")
+    print(f"Total Games: {summary['games']}")
+    for player_num, policy in ((1, args.policies[0]), (2, args.policies[1])):
+        p = summary[f"player{player_num}"]
+        print(f"Player {player_num} ({policy}) Wins: {p['wins']} ({p['win_rate'] * 100:.2f}%)")
+    print(f"Draws: {summary['draws']} ({summary['draw_rate'] * 100:.2f}%)")
+    if summary["average_turns"] is not None:
+        print(f"Average turns in decided games: {summary['average_turns']:.2f}")
+    print(f"Average walls per game: {summary['average_walls']:.2f}")
+    print(f"Finished in {elapsed:.2f} seconds ({summary['games'] / elapsed:.0f} games/s)")
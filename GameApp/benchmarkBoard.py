@@ -0,0 +1,51 @@
+import copy
+import pickle
+import random
+import timeit
+from boardState import BoardState
+
+# --------------------------------------------------------------
+# Times the ways of getting a board to work on: building a new one, clone() (which copy.deepcopy() also uses) and a serialize()/from_serialized()
+# round trip, against a pickle round trip, which copies the whole Space/Wall object graph generically like deepcopy used to.
+# The board being copied is a mid-game position (walls placed, pawns moved, undo history and distance maps filled in),
+# since that is what search agents and simulations copy.
+# --------------------------------------------------------------
+
+# a reproducible mid-game board: walls and pawn moves alternate between the players through push
+def midgame_board(size=9, walls=10, moves=10, seed=440):
+    rng = random.Random(seed)
+    board = BoardState(size=size)
+    placed = 0
+    while placed < walls:
+        r, c = rng.randrange(size - 1), rng.randrange(size - 1)
+        if board.push(("wall", {"corner1": (r, c), "corner2": (r + 1, c + 1), "direction": rng.randrange(2)})):
+            placed += 1
+    for _ in range(moves):
+        board.push(("move_jumpaware", {"target": rng.choice(board.legal_pawn_moves(board.turn))}))
+    board.goal_distance(1)
+    board.goal_distance(2)
+    return board
+
+# average microseconds per call of fn over number calls, best of repeat runs
+def time_us(fn, number, repeat=5):
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+
+def run_benchmark(size=9, number=200):
+    board = midgame_board(size)
+    data = board.serialize()
+    results = {
+        "BoardState()": time_us(lambda: BoardState(size=size), number),
+        "board.clone()": time_us(board.clone, number),
+        "copy.deepcopy(board)": time_us(lambda: copy.deepcopy(board), number),
+        "pickle round trip": time_us(lambda: pickle.loads(pickle.dumps(board)), number),
+        "from_serialized(serialize())": time_us(lambda: BoardState.from_serialized(board.serialize()), number),
+        "from_serialized(data)": time_us(lambda: BoardState.from_serialized(data), number),
+    }
+    return results
+
+if __name__ == "__main__":
+    results = run_benchmark()
+    graph_copy_us = results["pickle round trip"]
+    print("\nBoard construction and copying, 9x9 mid-game board:\n")
+    for name, us in results.items():
+        print(f"{name:<32}{us:>10.1f} us   ({graph_copy_us / us:.1f}x object graph copy speed)")
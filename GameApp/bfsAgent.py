@@ -0,0 +1,32 @@
+from astarpathfinding import a_star_path
+
+# --------------------------------------------------------------
+# This is the implementation for a baseline BFS agent that is used to test the A* agent.
+# --------------------------------------------------------------
+
+class BFSAgent:
+    def __init__(self, player_num):
+        self.player_num = player_num
+        self.opponent_num = 2 if player_num == 1 else 1
+        print(f"BFSAgent initialized for Player {self.player_num}")
+        
+    # Chooses the next action based on the shortest path found by BFS.
+    def choose_action(self, board_state):
+        # Use the existing a_star_path function which effectively performs BFS
+        shortest_path = a_star_path(board_state, self.player_num)
+
+        if not shortest_path:
+            # No path to the goal: take whichever legal move gets closest to the goal row, or pass if there is none
+            moves = board_state.legal_pawn_moves(self.player_num)
+            if not moves:
+                return ("noop", {})
+            goal_row = board_state.goal_row(self.player_num)
+            return ("move_jumpaware", {"target": min(moves, key=lambda pos: abs(goal_row - pos[0]))})
+
+        if len(shortest_path) < 2:
+            # Already at the goal or cannot move
+            return ("noop", {})
+
+        # The next position is the second element in the path
+        next_pos = shortest_path[1]
+        return ("move_jumpaware", {"target": next_pos})
@@ -0,0 +1,343 @@
+from player import Player
+from zobrist import zobrist_keys
+from pawnMoves import pawn_moves
+
+# An alternative BoardState backend that stores the whole position in a handful of Python integers used as bitboards,
+# instead of a grid of Space objects wired to Wall objects by reference.
+#
+#   CELL BITS:
+#       - cell (r,c) is bit r*size + c
+#       - blocked[d] has a bit set for every cell that cannot move in direction d ([N,E,S,W], same order as Space.get_walls)
+#       - the outside edges are always blocked, so shifting a bitboard never wraps around a row
+#       - pawns[p] is a one-hot bitboard holding the square of player p+1
+#
+#   WALL SLOT BITS:
+#       - a wall slot is the 2x2 block of cells with top-left corner (r,c), it is bit r*(size-1) + c
+#       - hWalls / vWalls hold the walls that were actually placed
+#       - hBlocked / vBlocked hold the slots that can no longer be used, either because a wall was placed there or because it would overlap one
+#
+# The public API matches BoardState (place_wall, move_player, teleport_player, players, size, board[r][c].get_walls()),
+# so a_star_path, AStarAgent and the tournament scripts can use either backend.
+class BitBoardState:
+    def __init__(self, *args, size=9, playerCount=2):
+
+        if len(args) == 1 and isinstance(args[0], BitBoardState): # branch for copying a previous board state
+            input = args[0]
+            self.size = input.size
+            self.full = input.full
+            self.blocked = list(input.blocked)
+            self.hWalls = input.hWalls
+            self.vWalls = input.vWalls
+            self.hBlocked = input.hBlocked
+            self.vBlocked = input.vBlocked
+            self.pawns = list(input.pawns)
+            self.players = [Player(p.X, p.Y, p.PlayerNo) for p in input.players]
+            self.zobrist_keys = input.zobrist_keys
+            self.zobrist = input.zobrist
+            self.turn = input.turn
+            self.history = []
+            self.distance_cache = {}
+
+        else:
+            if size > 1 and size % 2 != 0:
+                self.size = size
+            else:
+                self.size = 9
+            self.full = (1 << (self.size * self.size)) - 1
+            self.edge_init()
+            self.hWalls = 0
+            self.vWalls = 0
+            self.hBlocked = 0
+            self.vBlocked = 0
+            self.zobrist_keys = zobrist_keys(self.size) # same keys as BoardState, so both backends hash a position identically
+            self.turn = 1
+            self.zobrist = self.zobrist_keys["turn"][0]
+            self.history = []
+            self.distance_cache = {} # player number -> (hWalls, vWalls, distance layers), see distance_layers
+            self.player_init(playerCount)
+
+        self.board = BitGrid(self)
+
+    # builds the blocked bitboards for an empty board, where only the outside edges stop movement
+    def edge_init(self):
+        n = self.size
+        north = (1 << n) - 1
+        south = north << (n * (n - 1))
+        west = 0
+        for r in range(n):
+            west |= 1 << (r * n)
+        east = west << (n - 1)
+        self.blocked = [north, east, south, west]
+
+    # same starting squares as BoardState.player_init; defaults to 2 players if playerCount is more than 4 or less than 2
+    def player_init(self, playerCount):
+        if playerCount > 4 or playerCount < 2:
+                playerCount = 2
+        self.players = []
+        self.players.append(Player(self.size//2, 0, 1)) # player 1: starts at north edge of board
+        self.players.append(Player(self.size//2, self.size-1, 2)) # player 2: starts at south edge of board
+        if playerCount >= 3:
+                self.players.append(Player(self.size // 2, 0, 3))
+                if playerCount == 4:
+                    self.players.append(Player(self.size // 2, self.size-1, 4))
+        self.pawns = [self.cell_bit(p.Y, p.X) for p in self.players]
+        for p in self.players:
+            self.zobrist ^= self.zobrist_keys["pawn"][p.PlayerNo - 1][p.Y * self.size + p.X]
+
+    # returns the single bit representing the cell (y,x)
+    def cell_bit(self, y, x):
+        return 1 << (y * self.size + x)
+
+    # returns the player number on cell (y,x), or None if it is empty
+    def player_at(self, y, x):
+        bit = self.cell_bit(y, x)
+        for i, pawn in enumerate(self.pawns):
+            if pawn & bit:
+                return i + 1
+        return None
+
+    # same output as Space.get_walls: [N,E,S,W] with 1 for a blocked direction
+    def get_walls(self, y, x):
+        k = y * self.size + x
+        return [(b >> k) & 1 for b in self.blocked]
+
+    # moves a player to a desired spot on the board
+    def teleport_player(self, player_num, y, x):
+        player = self.players[player_num - 1]
+        keys = self.zobrist_keys["pawn"][player_num - 1]
+        self.zobrist ^= keys[player.Y * self.size + player.X] ^ keys[y * self.size + x]
+        player.move(x, y)
+        self.pawns[player_num - 1] = self.cell_bit(y, x)
+
+    # same as BoardState.legal_pawn_moves: the (y,x) squares the player's pawn can move to, jumps and sidesteps included
+    def legal_pawn_moves(self, player_num, pos=None):
+        y, x = pos if pos is not None else (self.players[player_num - 1].Y, self.players[player_num - 1].X)
+        occupied = 0
+        for i, pawn in enumerate(self.pawns):
+            if i != player_num - 1:
+                occupied |= pawn
+        return [divmod(k, self.size) for k in pawn_moves(self.size, self.blocked, occupied, y * self.size + x)]
+
+    # moves the player 1 space in the desired direction; does not check for walls
+    def move_player(self, player_num, direction):
+        player = self.players[player_num - 1]
+        if direction == 0: # north
+            self.teleport_player(player_num, player.Y-1, player.X)
+        elif direction == 1: # east
+            self.teleport_player(player_num, player.Y, player.X+1)
+        elif direction == 2: # south
+            self.teleport_player(player_num, player.Y+1, player.X)
+        elif direction == 3: # west
+            self.teleport_player(player_num, player.Y, player.X-1)
+        else:
+            raise ValueError ("Invalid direction")
+
+    # same arguments as BoardState.place_wall: two directly-diagonal corners and 0 for horizontal, 1 for vertical
+    # returns False if the wall is out of bounds, overlaps another wall, or would cut a player off from its goal row
+    def place_wall(self, corner1, corner2, direction):
+        if abs(corner1[0] - corner2[0]) != 1 or abs(corner1[1] - corner2[1]) != 1:
+            return False
+        r = min(corner1[0], corner2[0])
+        c = min(corner1[1], corner2[1])
+        n = self.size
+        if r < 0 or c < 0 or r >= n - 1 or c >= n - 1:
+            return False
+        slot = 1 << (r * (n - 1) + c)
+        if direction == 0:
+            if self.hBlocked & slot:
+                return False
+        elif direction == 1:
+            if self.vBlocked & slot:
+                return False
+        else:
+            return False
+
+        saved = list(self.blocked)
+        k = r * n + c # top-left cell of the 2x2 block
+        if direction == 0:
+            top = (1 << k) | (1 << (k + 1))
+            self.blocked[2] |= top
+            self.blocked[0] |= top << n
+        else:
+            left = (1 << k) | (1 << (k + n))
+            self.blocked[1] |= left
+            self.blocked[3] |= left << 1
+
+        if not self.has_path(1) or not self.has_path(2):
+            self.blocked = saved
+            return False
+
+        self.zobrist ^= self.zobrist_keys["wall"][direction][r * (n - 1) + c]
+        if direction == 0:
+            self.hWalls |= slot
+            self.hBlocked |= slot | (slot << 1 if c < n - 2 else 0) | (slot >> 1 if c > 0 else 0)
+            self.vBlocked |= slot
+        else:
+            self.vWalls |= slot
+            self.vBlocked |= slot | (slot << (n - 1)) | (slot >> (n - 1))
+            self.hBlocked |= slot
+        self.hBlocked &= (1 << ((n - 1) * (n - 1))) - 1
+        self.vBlocked &= (1 << ((n - 1) * (n - 1))) - 1
+        return True
+
+    # returns the number of the player whose turn comes after player_num
+    def next_player(self, player_num):
+        return player_num % len(self.players) + 1
+
+    # same contract as BoardState.push; the whole position is a few integers, so the undo record is simply a copy of them
+    def push(self, action, player_num=None):
+        if player_num is None:
+            player_num = self.turn
+        kind, params = action
+        player = self.players[player_num - 1]
+        record = (action, player_num, self.turn, player.Y, player.X, list(self.blocked), list(self.pawns),
+                  self.hWalls, self.vWalls, self.hBlocked, self.vBlocked, self.zobrist)
+
+        if kind == "move":
+            self.move_player(player_num, params["direction"])
+        elif kind == "move_jumpaware":
+            self.teleport_player(player_num, *params["target"])
+        elif kind == "wall":
+            if not self.place_wall(params["corner1"], params["corner2"], params["direction"]):
+                return False
+        elif kind != "noop":
+            raise ValueError ("Invalid action")
+
+        self.history.append(record)
+        keys = self.zobrist_keys["turn"]
+        next_turn = self.next_player(player_num)
+        self.zobrist ^= keys[self.turn - 1] ^ keys[next_turn - 1]
+        self.turn = next_turn
+        return True
+
+    # undoes the most recent push and returns its action
+    def pop(self):
+        (action, player_num, self.turn, y, x, self.blocked, self.pawns,
+         self.hWalls, self.vWalls, self.hBlocked, self.vBlocked, self.zobrist) = self.history.pop()
+        self.players[player_num - 1].move(x, y)
+        return action
+
+    # returns the goal row of a player, same as BoardState.goal_row
+    def goal_row(self, player_num):
+        if player_num == 1:
+            return self.size - 1
+        elif player_num == 2:
+            return 0
+        raise ValueError("Invalid player number (should be 1 or 2)")
+
+    # breadth-first search from the whole goal row at once, one bitboard per distance: layers[d] holds every cell d steps from the goal row
+    # the result only depends on the walls, so it is cached together with the wall bitboards it was computed for
+    def distance_layers(self, player_num):
+        cached = self.distance_cache.get(player_num)
+        if cached is not None and cached[0] == self.hWalls and cached[1] == self.vWalls:
+            return cached[2]
+        n = self.size
+        north, east, south, west = self.blocked
+        frontier = reach = ((1 << n) - 1) << (n * self.goal_row(player_num))
+        layers = []
+        while frontier:
+            layers.append(frontier)
+            step = ((frontier & ~north) >> n) | ((frontier & ~south) << n) | ((frontier & ~east) << 1) | ((frontier & ~west) >> 1)
+            frontier = step & self.full & ~reach
+            reach |= frontier
+        self.distance_cache[player_num] = (self.hWalls, self.vWalls, layers)
+        return layers
+
+    # same result as BoardState.distance_map: a size x size grid of steps to the goal row, None where it cannot be reached
+    def distance_map(self, player_num):
+        dist = [[None] * self.size for _ in range(self.size)]
+        for d, layer in enumerate(self.distance_layers(player_num)):
+            for k in range(self.size * self.size):
+                if (layer >> k) & 1:
+                    dist[k // self.size][k % self.size] = d
+        return dist
+
+    # number of steps the player needs to reach its goal row ignoring pawns, or None if it is walled off
+    def goal_distance(self, player_num):
+        pawn = self.pawns[player_num - 1]
+        for d, layer in enumerate(self.distance_layers(player_num)):
+            if layer & pawn:
+                return d
+        return None
+
+    # the neighboring cell (y, x) one step closer to the player's goal row, ignoring pawns; None if already there or walled off
+    def next_step(self, player_num):
+        d = self.goal_distance(player_num)
+        if not d:
+            return None
+        closer = self.distance_layers(player_num)[d - 1]
+        player = self.players[player_num - 1]
+        walls = self.get_walls(player.Y, player.X)
+        for direction, (dy, dx) in ((0, (-1, 0)), (2, (1, 0)), (3, (0, -1)), (1, (0, 1))): # same order BoardState lists neighbors in
+            if not walls[direction] and closer & self.cell_bit(player.Y + dy, player.X + dx):
+                return (player.Y + dy, player.X + dx)
+        return None
+
+    # flood fills the cells reachable by a player (ignoring pawns) and checks whether any of them is on its goal row
+    def has_path(self, player_num):
+        n = self.size
+        if player_num == 1:
+            goal = ((1 << n) - 1) << (n * (n - 1))
+        else:
+            goal = (1 << n) - 1
+        north, east, south, west = self.blocked
+        reach = frontier = self.pawns[player_num - 1]
+        while frontier:
+            if reach & goal:
+                return True
+            step = ((frontier & ~north) >> n) | ((frontier & ~south) << n) | ((frontier & ~east) << 1) | ((frontier & ~west) >> 1)
+            frontier = step & self.full & ~reach
+            reach |= frontier
+        return bool(reach & goal)
+
+    # prints the board state in the same layout as BoardState.__str__, "\" marks a placed wall
+    def __str__(self):
+        grid_str = ""
+        for r in range(self.size):
+            for c in range(self.size):
+                player = self.player_at(r, c)
+                grid_str += "0" if player is None else f"{player}"
+                if c < self.size-1:
+                    grid_str += "\\" if self.get_walls(r, c)[1] else "|"
+            grid_str += "\n"
+            if r < self.size-1:
+                for c in range(self.size):
+                    grid_str += "\\" if self.get_walls(r, c)[2] else "-"
+                    grid_str += " "
+                grid_str += "\n"
+        return grid_str
+
+
+# read-only stand-in for a Space, so code written against board.board[r][c] (a_star_path, the agents, the test scripts) works unchanged
+class BitSpace:
+    def __init__(self, state, y, x):
+        self.state = state
+        self.pos = (y, x)
+
+    @property
+    def player(self):
+        return self.state.player_at(*self.pos)
+
+    def get_walls(self):
+        return self.state.get_walls(*self.pos)
+
+    def is_open(self, direction):
+        return not (self.state.blocked[direction] >> (self.pos[0] * self.state.size + self.pos[1])) & 1
+
+    # the test scripts clear the starting squares by hand before teleporting; pawns live in the bitboards so this only clears the bit
+    def remove_player(self):
+        temp = self.player
+        if temp is not None:
+            self.state.pawns[temp - 1] &= ~self.state.cell_bit(*self.pos)
+        return temp
+
+
+# supports both board[r][c] and board[r, c] indexing like the numpy array used by BoardState; the spaces are created once per board
+class BitGrid:
+    def __init__(self, state):
+        self.rows = [[BitSpace(state, r, c) for c in range(state.size)] for r in range(state.size)]
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            return self.rows[key[0]][key[1]]
+        return self.rows[key]
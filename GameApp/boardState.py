@@ -1,9 +1,16 @@
 from typing import List
+from collections import deque
+from operator import itemgetter
+import heapq
 import numpy as np
 from player import Player
 from space import Space
 from wall import Wall
-from astarpathfinding import a_star_path
+from zobrist import zobrist_keys
+from pawnMoves import pawn_moves
+
+WALL_CUT_CACHE_SIZE = 4096 # wall configurations remembered by legal_walls before its cache is cleared
+BOARD_LAYOUTS = {} # board size -> BoardLayout, filled in by board_layout the first time a process needs that size; read it through board_layout
 
 #the board is a 9X9 grid of tuples ([int], int).
 #   -The first element is the wall state array, the second number is the player number
@@ -42,46 +49,144 @@ class BoardState:
     def __init__(self, *args, size=9, playerCount=2):
 
         if len(args) == 1 and isinstance(args[0], BoardState): # branch for copying a previous board state
-            input = args[0]
-            self.size = input.size
-            self.board = np.copy(input.board)
-            self.players = input.players
-            self.hWalls = input.hWalls
-            self.vWalls = input.vWalls
+            self.copy_from(args[0])
 
         else:
             if size > 1 and size % 2 != 0:
                 self.size = size
             else:
                 self.size = 9
-            self.board = np.empty((self.size, self.size), dtype=object) # an ndarray from numpy library
-            for r in range(self.size):
-                for c in range(self.size):
-                    self.board[r,c] = Space(r,c) # fill the board with Space objects
-            for r in range(self.size):
-                for c in range(self.size):
-                    self.add_neighbors(r,c) # assign spaces to their neighbors
-            
-            self.wall_init() # create all possible wall placements
+            layout = board_layout(self.size)
+            self.layout_init(layout) # spaces and walls, assembled from the per-size template's tables
+
+            self.zobrist_keys = zobrist_keys(self.size)
+            self.turn = 1 # the player whose turn it is, used by push/pop
+            self.zobrist = self.zobrist_keys["turn"][0] # hash of the current position, kept up to date by every method that changes the board
+            self.history = [] # undo records for push/pop, most recent last
+            self.distance_maps = {} # goal-distance fields by player number, see distance_map
+            self.wall_points = {} # grid point (row, col) between spaces -> number of placed walls touching it, see can_disconnect
+            self.wall_set_bits = 0 # bit slot_index(wall) is set when wall.set is True, see legal_walls
+            self.wall_hash = 0 # Zobrist hash of the placed walls only
+            self.wall_cuts = {} # wall_hash -> {slot index: spaces each player would be cut off from}, see legal_walls
+            self.blocked = list(layout.edges) # [N,E,S,W] bitboards (bit y*size + x) of the spaces that cannot move that way, like BitBoardState
+            self.placed_walls = [] # the walls actually placed (not just blocked by overlap), in placement order
             self.player_init(playerCount) # create and place players
 
+    # wires up the spaces and walls of an empty board from scratch with add_neighbors and wall_init; used once per size to build the template
+    def grid_init(self):
+        self.board = np.empty((self.size, self.size), dtype=object) # an ndarray from numpy library
+        for r in range(self.size):
+            for c in range(self.size):
+                self.board[r,c] = Space(r,c) # fill the board with Space objects
+        for r in range(self.size):
+            for c in range(self.size):
+                self.add_neighbors(r,c) # assign spaces to their neighbors
+        self.wall_init() # create all possible wall placements
+
+    # builds the spaces and walls of an empty board from the per-size template, instead of add_neighbors and wall_init
+    def layout_init(self, layout):
+        n = self.size
+        spaces = [Space(r, c) for r in range(n) for c in range(n)]
+        for space, adjacent, mask in zip(spaces, layout.neighbors, layout.open):
+            space.neighbors = list(adjacent(spaces))
+            space.open = mask
+        self.board = np.empty((n, n), dtype=object)
+        self.board.flat[:] = spaces
+        self.walls_init(layout, spaces)
+
+    # creates the walls of the template over the given spaces (indexed y*size + x), all unset
+    def walls_init(self, layout, spaces):
+        self.all_walls = [Wall(list(corners(spaces)), pos, direction) for corners, pos, direction in layout.walls]
+        for wall, overlapping in zip(self.all_walls, layout.wall_neighbors):
+            wall.neighbors = list(overlapping(self.all_walls))
+        half = len(self.all_walls) // 2
+        self.hWalls = self.all_walls[:half]
+        self.vWalls = self.all_walls[half:]
+        self.wall_slots = layout.wall_slots
+        self.wall_pairs = layout.wall_pairs
+
+    # returns an independent copy of the board, same as BoardState(board)
+    def clone(self):
+        return BoardState(self)
+
+    # copy.deepcopy(board) is a clone; walking the Space/Wall graph generically recurses deeper than Python allows once they use __slots__
+    def __deepcopy__(self, memo):
+        copied = memo[id(self)] = self.clone()
+        return copied
+
+    # fills this (new) board with a copy of another one in a single pass: spaces, walls and players are recreated and every reference
+    # between them (neighbors, wall spaces, undo history) is translated by index (y*size + x for spaces, slot_index for walls)
+    # the walls themselves come from the per-size template; the tables that never change for a board size (zobrist_keys, wall_slots,
+    # wall_pairs) are shared, and so is wall_cuts, whose entries only depend on the walls placed and so are valid on any board
+    def copy_from(self, input):
+        n = self.size = input.size
+        spaces = [Space(r, c) for r in range(n) for c in range(n)]
+        for old, space in zip(input.board.flat, spaces):
+            space.player = old.player
+            space.open = old.open
+            space.neighbors = [spaces[s.pos[0] * n + s.pos[1]] for s in old.neighbors]
+        self.board = np.empty((n, n), dtype=object)
+        self.board.flat[:] = spaces
+
+        self.walls_init(board_layout(n), spaces)
+        for old, wall in zip(input.all_walls, self.all_walls):
+            wall.set = old.set
+        self.placed_walls = [self.all_walls[self.slot_index(w)] for w in input.placed_walls]
+
+        self.players = [Player(p.X, p.Y, p.PlayerNo) for p in input.players]
+        self.turn = input.turn
+        self.zobrist_keys = input.zobrist_keys
+        self.zobrist = input.zobrist
+        self.wall_set_bits = input.wall_set_bits
+        self.wall_hash = input.wall_hash
+        self.wall_cuts = input.wall_cuts
+        self.blocked = list(input.blocked)
+        self.wall_points = dict(input.wall_points)
+        self.distance_maps = {p: [row[:] for row in dist] for p, dist in input.distance_maps.items()}
+
+        self.history = []
+        for action, player_num, turn, y, x, wall_record in input.history:
+            if wall_record is not None:
+                wall, removed_neighbors, newly_set = wall_record
+                wall_record = (self.all_walls[self.slot_index(wall)],
+                               [(spaces[a.pos[0] * n + a.pos[1]], spaces[b.pos[0] * n + b.pos[1]]) for a, b in removed_neighbors],
+                               [self.all_walls[self.slot_index(w)] for w in newly_set])
+            self.history.append((action, player_num, turn, y, x, wall_record))
+
     # moves a player to a desired spot on the board, used for handling logic of 1 player jumping over another, as well as testing purposes
     def teleport_player(self, player_num, y, x):
         player = self.players[player_num - 1]
+        keys = self.zobrist_keys["pawn"][player_num - 1]
+        self.zobrist ^= keys[player.Y * self.size + player.X] ^ keys[y * self.size + x]
         self.board[player.Y, player.X].remove_player()
         player.move(x, y)
         self.board[y, x].insert_player(player.PlayerNo)
 
+    # the blocked bitboards of an empty board, where only the outside edges stop movement
+    def edge_bits(self):
+        n = self.size
+        north = (1 << n) - 1
+        west = 0
+        for r in range(n):
+            west |= 1 << (r * n)
+        return [north, west << (n - 1), north << (n * (n - 1)), west]
+
     # initializes two arrays of Wall objects, one for horizontal walls, one for vertical walls; called in the constructor
     # since walls block two pairs of spaces, there are (board.size-1)^2 possible locations for horizontal walls and an equal number for vertical walls
     # since some possible wall placements overlap with others, we must also include those conflicting walls as neighbors for when the walls are activated, so we can set them as illegal moves
+    # also builds the lookup tables used by find_wall and get_wall, which hold slot indices (see slot_index) rather than walls so copies of the board can share them:
+    #   - wall_slots maps (row, col, direction) of the top-left space to the wall
+    #   - wall_pairs maps (pos1, pos2, direction) for every pair of spaces a wall touches to the first wall in hWalls/vWalls containing both,
+    #     which covers both diagonal corner pairs as well as the adjacent pairs used when printing the board
     def wall_init(self):
         self.hWalls = []
         self.vWalls = []
+        self.wall_slots = {}
+        self.wall_pairs = {}
         for r in range(self.size-1):
                 for c in range(self.size-1):
-                    hWall = Wall([self.board[r,c],self.board[r+1,c],self.board[r,c+1],self.board[r+1,c+1]])
-                    vWall = Wall([self.board[r,c],self.board[r,c+1],self.board[r+1,c],self.board[r+1,c+1]])
+                    hWall = Wall([self.board[r,c],self.board[r+1,c],self.board[r,c+1],self.board[r+1,c+1]], (r,c), 0)
+                    vWall = Wall([self.board[r,c],self.board[r,c+1],self.board[r+1,c],self.board[r+1,c+1]], (r,c), 1)
                     
                     # set conflicting wall placements as neighbors of each other; currently only considers conflicting walls in same direction
                     # Connect horizontally adjacent horizontal walls that might overlap
@@ -105,6 +210,13 @@ class BoardState:
                     self.hWalls.append(hWall)
                     self.vWalls.append(vWall)
 
+        self.all_walls = self.hWalls + self.vWalls # indexed by slot_index
+        for index, wall in enumerate(self.all_walls):
+            self.wall_slots[(wall.pos[0], wall.pos[1], wall.direction)] = index
+            for s1 in wall.spaces:
+                for s2 in wall.spaces:
+                    self.wall_pairs.setdefault((s1.pos, s2.pos, wall.direction), index)
+
     # initializes each Player object; called in the constructor. Defaults to 2 players if playerCount is more than 4 or less than 2
     # Each player starts in the middle of one side of the board. Player objects store their location, and spaces on the board store the player
     # players are initialized with (x,y,playerNo), but all other instances of coordinates are reversed (y,x) for printing purposes
@@ -120,6 +232,7 @@ class BoardState:
                     self.players.append(Player(self.size // 2, self.size-1, 4)) # player 4: starts at south edge of board? (should be east or west)
         for p in self.players:
                 self.board[p.Y, p.X].insert_player(p.PlayerNo)
+                self.zobrist ^= self.zobrist_keys["pawn"][p.PlayerNo - 1][p.Y * self.size + p.X]
 
     # designates the neighboring spaces for each space; called in the constructor
     # each space keeps track of the spaces that it can connect to. When a wall is activated, the respective neighbor is removed from that array
@@ -140,61 +253,385 @@ class BoardState:
     # The final parameter of the place_wall function is the direction of the wall that will be placed, 0 is for a horizontal wall, 1 is for a vertical wall.
     # walls have four designated spaces, only 1 horiz and 1 vert can have the same set of spaces
     def place_wall(self, corner1, corner2, direction): # 0 for horizontal, 1 for vertical
+        return self.try_wall(corner1, corner2, direction) is not None
+
+    # places a wall the same way as place_wall, but returns the record needed to undo it (see apply_wall), or None if the wall is not legal
+    def try_wall(self, corner1, corner2, direction):
         # 1. Try to place the wall tentatively
         wall = self.find_wall(self.board[corner1[0], corner1[1]], self.board[corner2[0], corner2[1]], direction)
         if wall is None or wall.set:
-            return False  # Already set or invalid
+            return None  # Already set or invalid
+        check_paths = self.can_disconnect(wall)
+        record = self.apply_wall(wall)
 
-        # Save current state for rollback
+        # 2. Check if both players have a path; skipped when the wall cannot close off any area
+        valid = not check_paths or (self.has_path(1) and self.has_path(2))
+
+        # 3. Rollback if not valid
+        if not valid:
+            self.undo_wall(record)
+            return None
+
+        return record
+
+    # activates a wall without checking that it is legal; removes the two pairs of spaces from each other's neighbors and marks the wall and its overlapping walls as set
+    # returns (wall, removed neighbor links, walls whose set flag was changed) so that undo_wall restores exactly the previous state
+    def apply_wall(self, wall):
         removed_neighbors = []
         for i in range(0, 4, 2):
             s1, s2 = wall.spaces[i], wall.spaces[i+1]
-            if s2 in s1.neighbors:
-                s1.neighbors.remove(s2)
+            if s1.is_open(s1.direction_to(s2)):
+                s1.remove_neighbor(s2)
                 removed_neighbors.append((s1, s2))
-            if s1 in s2.neighbors:
-                s2.neighbors.remove(s1)
+            if s2.is_open(s2.direction_to(s1)):
+                s2.remove_neighbor(s1)
                 removed_neighbors.append((s2, s1))
+        for s1, s2 in removed_neighbors:
+            self.blocked[s1.direction_to(s2)] |= 1 << (s1.pos[0] * self.size + s1.pos[1])
 
-        wall.set = True
-        for n in wall.neighbors:
-            n.set = True
+        newly_set = [w for w in [wall] + wall.neighbors if not w.set]
+        for w in newly_set:
+            w.set = True
+            self.wall_set_bits |= 1 << self.slot_index(w)
+        self.placed_walls.append(wall)
+        self.zobrist ^= self.wall_key(wall)
+        self.wall_hash ^= self.wall_key(wall)
+        for point in self.points_of(wall):
+            self.wall_points[point] = self.wall_points.get(point, 0) + 1
+        for dist in self.distance_maps.values():
+            self.repair_removed(dist, removed_neighbors)
+        return (wall, removed_neighbors, newly_set)
 
-        # 2. Check if both players have a path
-        path1 = a_star_path(self, 1)
-        path2 = a_star_path(self, 2)
-        valid = path1 is not None and path2 is not None
+    # reverses apply_wall; only the set flags that apply_wall changed are cleared, so walls blocked by other placed walls stay blocked
+    def undo_wall(self, record):
+        wall, removed_neighbors, newly_set = record
+        for w in newly_set:
+            w.set = False
+            self.wall_set_bits &= ~(1 << self.slot_index(w))
+        for s1, s2 in removed_neighbors:
+            s1.insert_neighbor(s2)
+            self.blocked[s1.direction_to(s2)] &= ~(1 << (s1.pos[0] * self.size + s1.pos[1]))
+        self.placed_walls.remove(wall)
+        self.zobrist ^= self.wall_key(wall)
+        self.wall_hash ^= self.wall_key(wall)
+        for point in self.points_of(wall):
+            self.wall_points[point] -= 1
+        for dist in self.distance_maps.values():
+            self.repair_inserted(dist, removed_neighbors)
 
-        # 3. Rollback if not valid
-        if not valid:
-            # Undo wall
-            wall.set = False
-            for n in wall.neighbors:
-                n.set = False
-            for s1, s2 in removed_neighbors:
-                s1.neighbors.append(s2)
-            return False
+    # position of a wall in all_walls and in the wall_set_bits bitmap: horizontal walls first, then vertical, each row by row
+    def slot_index(self, wall):
+        r, c = wall.pos
+        return wall.direction * (self.size-1) * (self.size-1) + r * (self.size-1) + c
+
+    # returns every wall that can be placed right now as (corner1, corner2, direction), so each entry can be passed straight to place_wall
+    # free slots come from wall_set_bits, and walls that can_disconnect rules out are legal without any search. For the rest, the spaces
+    # the wall would cut off (see cut_off_by) are cached per wall configuration (wall_hash); since the cache records spaces rather than a
+    # yes/no answer, pawn moves never invalidate it, and returning to a wall configuration (e.g. after pop) reuses it
+    def legal_walls(self):
+        cuts = self.wall_cuts.get(self.wall_hash)
+        if cuts is None:
+            if len(self.wall_cuts) >= WALL_CUT_CACHE_SIZE:
+                self.wall_cuts.clear()
+            cuts = self.wall_cuts[self.wall_hash] = {}
+        pawn1 = 1 << (self.players[0].Y * self.size + self.players[0].X)
+        pawn2 = 1 << (self.players[1].Y * self.size + self.players[1].X)
+        paths_now = None
+
+        legal = []
+        free = ((1 << len(self.all_walls)) - 1) & ~self.wall_set_bits
+        while free:
+            low = free & -free
+            free ^= low
+            index = low.bit_length() - 1
+            wall = self.all_walls[index]
+            if self.can_disconnect(wall):
+                if index not in cuts:
+                    cuts[index] = self.cut_off_by(wall)
+                cut = cuts[index]
+                if cut is None: # the wall closes no area, it is legal whenever the position itself is
+                    if paths_now is None:
+                        paths_now = self.has_path(1) and self.has_path(2)
+                    if not paths_now:
+                        continue
+                elif cut[0] & pawn1 or cut[1] & pawn2:
+                    continue
+            r, c = wall.pos
+            legal.append(((r, c), (r+1, c+1), wall.direction))
+        return legal
+
+    # for a wall that is not placed yet, returns bitmasks (bit y*size + x) of the spaces that could not reach player 1's and player 2's
+    # goal rows if it were added, or None if the wall leaves a way around itself and so would not change who can reach what
+    def cut_off_by(self, wall):
+        blocked = self.blocked_with(wall)
+        s = wall.spaces
+        for a, b in ((s[0], s[1]), (s[2], s[3])):
+            a_bit = 1 << (a.pos[0] * self.size + a.pos[1])
+            b_bit = 1 << (b.pos[0] * self.size + b.pos[1])
+            if not self.flood(a_bit, blocked, b_bit) & b_bit:
+                break
+        else:
+            return None
+        everything = (1 << (self.size * self.size)) - 1
+        row = (1 << self.size) - 1
+        return (everything & ~self.flood(row << (self.size * self.goal_row(1)), blocked),
+                everything & ~self.flood(row << (self.size * self.goal_row(2)), blocked))
+
+    # the blocked bitboards with the given wall added, without placing it
+    def blocked_with(self, wall):
+        blocked = list(self.blocked)
+        for i in range(0, 4, 2):
+            s1, s2 = wall.spaces[i], wall.spaces[i+1]
+            d = s1.direction_to(s2)
+            blocked[d] |= 1 << (s1.pos[0] * self.size + s1.pos[1])
+            blocked[(d + 2) % 4] |= 1 << (s2.pos[0] * self.size + s2.pos[1])
+        return blocked
 
+    # grows a set of spaces (as a bitmask) one step at a time in every direction that blocked allows, until it stops growing or touches stop
+    def flood(self, reach, blocked, stop=0):
+        n = self.size
+        everything = (1 << (n * n)) - 1
+        north, east, south, west = blocked
+        frontier = reach
+        while frontier and not reach & stop:
+            step = ((frontier & ~north) >> n) | ((frontier & ~south) << n) | ((frontier & ~east) << 1) | ((frontier & ~west) >> 1)
+            frontier = step & everything & ~reach
+            reach |= frontier
+        return reach
+
+    # the three grid points a wall runs through (its two ends and its middle); grid point (i, j) is the corner shared by spaces (i-1, j-1) and (i, j)
+    def points_of(self, wall):
+        r, c = wall.pos
+        if wall.direction == 0:
+            return ((r+1, c), (r+1, c+1), (r+1, c+2))
+        return ((r, c+1), (r+1, c+1), (r+2, c+1))
+
+    # a wall can only cut the board in two if it closes a loop with the board edge and the walls already placed, which needs at least two
+    # of its three points to already touch the edge or another wall; a wall touching at most one point never changes who can reach what
+    def can_disconnect(self, wall):
+        touching = 0
+        for i, j in self.points_of(wall):
+            if i == 0 or j == 0 or i == self.size or j == self.size or self.wall_points.get((i, j)):
+                touching += 1
+        return touching >= 2
+
+    # whether the player can still reach its goal row, ignoring pawns
+    # uses the cached distance map when there is one, otherwise floods outward from the pawn and stops as soon as the goal row is touched
+    def has_path(self, player_num):
+        player = self.players[player_num - 1]
+        if player_num in self.distance_maps:
+            return self.distance_maps[player_num][player.Y][player.X] is not None
+        goal = ((1 << self.size) - 1) << (self.size * self.goal_row(player_num))
+        return bool(self.flood(1 << (player.Y * self.size + player.X), self.blocked, goal) & goal)
+
+    # returns the goal row of a player; player 1 heads for the south edge, player 2 for the north edge (same as a_star_path)
+    def goal_row(self, player_num):
+        if player_num == 1:
+            return self.size - 1
+        elif player_num == 2:
+            return 0
+        raise ValueError("Invalid player number (should be 1 or 2)")
+
+    # returns a size x size grid holding, for every space, the number of steps to the player's goal row (None if the goal row cannot be reached)
+    # computed with a breadth-first search outward from every space of the goal row at once. Pawns are ignored, so the map only
+    # depends on the walls: it is cached until the next wall is placed or undone, and moving pawns never invalidates it
+    def distance_map(self, player_num):
+        dist = self.distance_maps.get(player_num)
+        if dist is None:
+            goal = self.goal_row(player_num)
+            dist = [[None] * self.size for _ in range(self.size)]
+            queue = deque()
+            for c in range(self.size):
+                dist[goal][c] = 0
+                queue.append(self.board[goal, c])
+            while queue:
+                space = queue.popleft()
+                d = dist[space.pos[0]][space.pos[1]] + 1
+                for n in space.neighbors:
+                    r, c = n.pos
+                    if dist[r][c] is None:
+                        dist[r][c] = d
+                        queue.append(n)
+            self.distance_maps[player_num] = dist
+        return dist
+
+    # updates a cached distance map after the links between the given pairs of spaces were removed, touching only the spaces behind the wall
+    # distances can only grow: first collect every space whose last step toward the goal went through a removed link (directly or through
+    # another such space), then recompute just those spaces from the unaffected spaces around them, nearest first
+    def repair_removed(self, dist, removed):
+        def supported(space, affected):
+            d = dist[space.pos[0]][space.pos[1]]
+            return d == 0 or any(dist[n.pos[0]][n.pos[1]] == d - 1 and n not in affected for n in space.neighbors)
+
+        queue = []
+        for s1, s2 in removed:
+            d1 = dist[s1.pos[0]][s1.pos[1]]
+            d2 = dist[s2.pos[0]][s2.pos[1]]
+            if d1 is not None and d2 is not None and d1 == d2 + 1:
+                queue.append(s1)
+        affected = set()
+        while queue:
+            space = queue.pop()
+            if space in affected or supported(space, affected):
+                continue
+            affected.add(space)
+            d = dist[space.pos[0]][space.pos[1]]
+            queue.extend(n for n in space.neighbors if dist[n.pos[0]][n.pos[1]] == d + 1 and n not in affected)
+        if not affected:
+            return
+
+        for space in affected:
+            dist[space.pos[0]][space.pos[1]] = None
+        heap = []
+        for space in affected:
+            known = [dist[n.pos[0]][n.pos[1]] for n in space.neighbors if n not in affected and dist[n.pos[0]][n.pos[1]] is not None]
+            if known:
+                heapq.heappush(heap, (min(known) + 1, space.pos, space))
+        while heap:
+            d, pos, space = heapq.heappop(heap)
+            if dist[pos[0]][pos[1]] is not None:
+                continue
+            dist[pos[0]][pos[1]] = d
+            for n in space.neighbors:
+                if n in affected and dist[n.pos[0]][n.pos[1]] is None:
+                    heapq.heappush(heap, (d + 1, n.pos, n))
+
+    # updates a cached distance map after the links between the given pairs of spaces were restored; distances can only shrink,
+    # so the shorter distances are pushed outward from the restored links until nothing improves
+    def repair_inserted(self, dist, inserted):
+        queue = deque()
+        for s1, s2 in inserted:
+            d2 = dist[s2.pos[0]][s2.pos[1]]
+            d1 = dist[s1.pos[0]][s1.pos[1]]
+            if d2 is not None and (d1 is None or d2 + 1 < d1):
+                dist[s1.pos[0]][s1.pos[1]] = d2 + 1
+                queue.append(s1)
+        while queue:
+            space = queue.popleft()
+            d = dist[space.pos[0]][space.pos[1]] + 1
+            for n in space.neighbors:
+                dn = dist[n.pos[0]][n.pos[1]]
+                if dn is None or d < dn:
+                    dist[n.pos[0]][n.pos[1]] = d
+                    queue.append(n)
+
+    # number of steps the player needs to reach its goal row ignoring pawns, or None if it is walled off
+    def goal_distance(self, player_num):
+        player = self.players[player_num - 1]
+        return self.distance_map(player_num)[player.Y][player.X]
+
+    # the neighboring space (y, x) one step closer to the player's goal row, ignoring pawns; None if already there or walled off
+    def next_step(self, player_num):
+        player = self.players[player_num - 1]
+        dist = self.distance_map(player_num)
+        d = dist[player.Y][player.X]
+        if not d:
+            return None
+        for n in self.board[player.Y, player.X].neighbors:
+            if dist[n.pos[0]][n.pos[1]] == d - 1:
+                return n.pos
+        return None
+
+    # the Zobrist key of a placed wall
+    def wall_key(self, wall):
+        r, c = wall.pos
+        return self.zobrist_keys["wall"][wall.direction][r * (self.size-1) + c]
+
+    # changes the side to move, keeping the hash in sync
+    def set_turn(self, player_num):
+        keys = self.zobrist_keys["turn"]
+        self.zobrist ^= keys[self.turn - 1] ^ keys[player_num - 1]
+        self.turn = player_num
+
+    # returns the number of the player whose turn comes after player_num
+    def next_player(self, player_num):
+        return player_num % len(self.players) + 1
+
+    # applies an agent action (the same ("move" | "move_jumpaware" | "wall" | "noop", params) tuples returned by choose_action) and records how to undo it
+    # player_num defaults to the side to move (self.turn); afterwards the turn passes to the next player
+    # returns False without changing anything if the action is a wall that cannot be placed
+    def push(self, action, player_num=None):
+        if player_num is None:
+            player_num = self.turn
+        kind, params = action
+        player = self.players[player_num - 1]
+        y, x = player.Y, player.X
+        wall_record = None
+
+        if kind == "move":
+            self.move_player(player_num, params["direction"])
+        elif kind == "move_jumpaware":
+            self.teleport_player(player_num, *params["target"])
+        elif kind == "wall":
+            wall_record = self.try_wall(params["corner1"], params["corner2"], params["direction"])
+            if wall_record is None:
+                return False
+        elif kind != "noop":
+            raise ValueError ("Invalid action")
+
+        self.history.append((action, player_num, self.turn, y, x, wall_record))
+        self.set_turn(self.next_player(player_num))
         return True
 
+    # undoes the most recent push and returns its action
+    def pop(self):
+        action, player_num, turn, y, x, wall_record = self.history.pop()
+        if wall_record is not None:
+            self.undo_wall(wall_record)
+        else:
+            player = self.players[player_num - 1]
+            if (player.Y, player.X) != (y, x):
+                self.teleport_player(player_num, y, x)
+        self.set_turn(turn)
+        return action
+
+    # a compact, picklable description of the position for sending boards between processes (much smaller than the Space/Wall object graph):
+    # (size, (y, x) of every pawn, placed walls as (row, col, direction) in placement order, side to move)
+    def serialize(self):
+        return (self.size, tuple((p.Y, p.X) for p in self.players),
+                tuple((w.pos[0], w.pos[1], w.direction) for w in self.placed_walls), self.turn)
+
+    # rebuilds a board from serialize() output; the walls were legal when placed, so they are applied without checking them again
+    @classmethod
+    def from_serialized(cls, data):
+        size, pawns, walls, turn = data
+        board = cls(size=size, playerCount=len(pawns))
+        for r, c, direction in walls:
+            board.apply_wall(board.get_wall(r, c, direction))
+        for i, (y, x) in enumerate(pawns):
+            board.teleport_player(i + 1, y, x)
+        for p in board.players: # a pawn moved off a square another pawn was just moved onto clears it, so mark the squares again
+            board.board[p.Y, p.X].insert_player(p.PlayerNo)
+        board.set_turn(turn)
+        return board
+
     # helper function, returns the first wall in the list that contains the two desired spaces. 
     # Direction is boolean, determines if we check the horizontal wall list (0) or vertical wall list (1)
-    # No return if wall is not found
+    # Returns None if wall is not found
     def find_wall(self, space1, space2,direction)->Wall:
-        if direction == 0:
-            for h in self.hWalls:
-                if space1 in h.spaces and space2 in h.spaces:
-                    return h
+        index = self.wall_pairs.get((space1.pos, space2.pos, direction))
+        return None if index is None else self.all_walls[index]
 
-        elif direction == 1:
-            for v in self.vWalls:
-                if space1 in v.spaces and space2 in v.spaces:
-                    return v
+    # returns the wall whose 2x2 block has (row, col) as its top-left space, or None if there is no such wall
+    def get_wall(self, row, col, direction)->Wall:
+        index = self.wall_slots.get((row, col, direction))
+        return None if index is None else self.all_walls[index]
+
+    # returns every square the player's pawn can move to this turn as (y,x) tuples, jumps and diagonal sidesteps included
+    # pos lets callers such as a_star_path ask from a square the pawn is not actually on; the other pawns stay where they are
+    def legal_pawn_moves(self, player_num, pos=None):
+        y, x = pos if pos is not None else (self.players[player_num - 1].Y, self.players[player_num - 1].X)
+        occupied = 0
+        for p in self.players:
+            if p.PlayerNo != player_num:
+                occupied |= 1 << (p.Y * self.size + p.X)
+        return [divmod(k, self.size) for k in pawn_moves(self.size, self.blocked, occupied, y * self.size + x)]
 
     # moves the player 1 space in the desired direction; does not check for walls
     # external game logic should check for valid moves and players before calling this function
     def move_player(self, player_num, direction):
             player = self.players[player_num-1]
+            old_y, old_x = player.Y, player.X
             self.board[player.Y,player.X].remove_player()
             if direction == 0: # north
                 player.move(player.X,player.Y-1)               
@@ -207,6 +644,8 @@ class BoardState:
             else:
                 raise ValueError ("Invalid direction")
             self.board[player.Y,player.X].insert_player(player_num)
+            keys = self.zobrist_keys["pawn"][player_num - 1]
+            self.zobrist ^= keys[old_y * self.size + old_x] ^ keys[player.Y * self.size + player.X]
 
     # prints the board state, used when print(BoardState) is called
     def __str__(self):
@@ -238,6 +677,41 @@ class BoardState:
                     grid_str += " "
                 grid_str += "\n"       
         return grid_str
+
+
+# the parts of a board that are the same for every board of one size, kept as flat index tables (spaces by y*size + x, walls by slot_index)
+# built once per size from a board wired up by add_neighbors and wall_init; later boards and copies are assembled from it
+# the index lists are stored as itemgetters, which pick the listed objects out of a new board's spaces or walls in a single C call
+class BoardLayout:
+    def __init__(self, board):
+        n = board.size
+        self.neighbors = [picker([s.pos[0] * n + s.pos[1] for s in space.neighbors]) for space in board.board.flat]
+        self.open = [space.open for space in board.board.flat]
+        self.walls = [(picker([s.pos[0] * n + s.pos[1] for s in w.spaces]), w.pos, w.direction) for w in board.all_walls]
+        self.wall_neighbors = [picker([board.slot_index(x) for x in w.neighbors]) for w in board.all_walls]
+        self.wall_slots = board.wall_slots
+        self.wall_pairs = board.wall_pairs
+        self.edges = board.edge_bits()
+
+# the BoardLayout for a board size, built from a board wired up from scratch the first time it is asked for in this process
+# (a board that was unpickled or sent to a worker process may be the first of its size there, so copies go through here too)
+def board_layout(size):
+    layout = BOARD_LAYOUTS.get(size)
+    if layout is None:
+        board = BoardState.__new__(BoardState)
+        board.size = size
+        board.grid_init()
+        layout = BOARD_LAYOUTS[size] = BoardLayout(board)
+    return layout
+
+# an itemgetter that always returns a tuple, even for zero or one index
+def picker(indices):
+    if len(indices) == 1:
+        return lambda items: (items[indices[0]],)
+    if not indices:
+        return lambda items: ()
+    return itemgetter(*indices)
+
     
 ### Testing code
 # board = BoardState(size=5)
@@ -253,4 +727,3 @@ class BoardState:
 # print(board2)
 
 
-
@@ -3,6 +3,8 @@ import sys
 from boardState import BoardState
 from GameManager import GameManager
 from aStarAgent import AStarAgent # Import AStarAgent for AI
+from mctsAgent import MCTSAgent # Searching AI, ponders during Player 1's turn
+from agentWorker import AgentWorker
 
 # --- Constants ---
 BOARD_SIZE = 9
@@ -15,6 +17,13 @@ BUTTON_HEIGHT = 40
 BUTTON_WIDTH = 180
 SCREEN_WIDTH = GRID_WIDTH
 SCREEN_HEIGHT = GRID_HEIGHT + INFO_HEIGHT + BUTTON_HEIGHT + 10
+AI_MIN_DELAY_MS = 1000 # shortest time an AI turn takes on screen, so its move can be followed
+
+# Player 2's agent and its settings. MCTSAgent searches for time_limit_ms per move and keeps searching (pondering) while
+# Player 1 thinks, for up to AI_PONDER_MS per move, so its next answer starts from that work.
+# Use (AStarAgent, {}) for the instant A* agent, which does not ponder.
+AI_AGENT = (MCTSAgent, {"time_limit_ms": 2000})
+AI_PONDER_MS = 30000
 
 # Colors
 WHITE = (255, 255, 255)
@@ -131,11 +140,9 @@ def draw_board(screen, board_state: BoardState, selected_piece_pos=None, possibl
             space1 = board_state.board[r, c]
             space_below1 = board_state.board[r + 1, c]
             space_right1 = board_state.board[r, c + 1]
-            space_diag1 = board_state.board[r + 1, c + 1]
 
             # A horizontal wall exists if BOTH pairs are blocked
-            is_h_wall = (space_below1 not in space1.neighbors) and \
-                        (space_diag1 not in space_right1.neighbors)
+            is_h_wall = not space1.is_open(2) and not space_right1.is_open(2)
                         # Add check for wall object if using them: and board_state.hWalls[r, c] is not None
 
             if is_h_wall:
@@ -147,8 +154,7 @@ def draw_board(screen, board_state: BoardState, selected_piece_pos=None, possibl
             # Check for Vertical Wall starting right of (r, c)
             # Re-use space objects from above
             # A vertical wall exists if BOTH pairs are blocked
-            is_v_wall = (space_right1 not in space1.neighbors) and \
-                        (space_diag1 not in space_below1.neighbors)
+            is_v_wall = not space1.is_open(1) and not space_below1.is_open(1)
                         # Add check for wall object if using them: and board_state.vWalls[r, c] is not None
 
             if is_v_wall:
@@ -157,78 +163,28 @@ def draw_board(screen, board_state: BoardState, selected_piece_pos=None, possibl
                 wall_rect = pygame.Rect(wall_x, wall_y, WALL_THICKNESS, SQUARE_SIZE * 2 + WALL_THICKNESS)
                 pygame.draw.rect(screen, BROWN, wall_rect)
 
+def apply_ai_action(board_state: BoardState, action, params):
+    """ Plays the AI's chosen action on the board """
+    if action == "noop":
+        pass # AI does nothing
+    elif action == "move":
+        # Simple move - needs validation ideally, but A* should be valid
+        board_state.move_player(2, params["direction"])
+    elif action == "move_jumpaware":
+         # A* gives target coords directly
+         y, x = params["target"]
+         board_state.teleport_player(2, y, x)
+    elif action == "wall":
+        c1 = params["corner1"]
+        c2 = params["corner2"]
+        direction = params["direction"]
+        success = board_state.place_wall(c1, c2, direction)
+
+        print(f"[AI Wall] Placement {'succeeded' if success else 'failed'} at {c1} and {c2}, direction {direction}")
+
 def get_valid_moves(board_state: BoardState, player_num: int):
-    """ Calculates valid moves for a player, including jumps """
-    player = board_state.players[player_num - 1]
-    start_pos = (player.Y, player.X)
-    size = board_state.size
-    move_dirs = [(-1, 0), (0, 1), (1, 0), (0, -1)] # N, E, S, W
-    valid_targets = set()
-
-    q = [(start_pos, 0)] # Position, distance (only distance 1 needed for direct moves/jumps)
-    visited = {start_pos}
-
-    opponent_pos = (board_state.players[1 if player_num == 1 else 0].Y,
-                    board_state.players[1 if player_num == 1 else 0].X)
-
-    r, c = start_pos
-    current_space = board_state.board[r, c]
-    walls = current_space.get_walls()
-
-    for dir_index, (dr, dc) in enumerate(move_dirs):
-        if walls[dir_index] == 0: # Check wall in moving direction
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < size and 0 <= nc < size:
-                neighbor_space = board_state.board[nr, nc]
-                # Check wall coming back (important!)
-                if board_state.board[nr,nc].get_walls()[(dir_index + 2) % 4] == 0:
-                    if (nr, nc) == opponent_pos:
-                        # --- Opponent Found: Check Jumps ---
-                        jump_r, jump_c = nr + dr, nc + dc
-                        # Check wall between opponent and jump spot
-                        if neighbor_space.get_walls()[dir_index] == 0:
-                             if 0 <= jump_r < size and 0 <= jump_c < size:
-                                 # Check wall coming back from jump spot
-                                 if board_state.board[jump_r, jump_c].get_walls()[(dir_index + 2) % 4] == 0:
-                                     # Check if jump spot is empty
-                                     if board_state.board[jump_r, jump_c].player is None:
-                                         valid_targets.add((jump_r, jump_c))
-                                         continue # Found direct jump, don't check diagonals from here
-
-                        # --- Opponent Found: Check Diagonal Sidesteps (if jump failed/blocked) ---
-                        # Check wall *behind* opponent first
-                        if neighbor_space.get_walls()[dir_index] == 1: # Wall behind opponent blocks diagonal
-                             pass # Cannot sidestep
-                        else:
-                            # Check diagonal left/right relative to move direction
-                            for side_step_dir in [-1, 1]: # -1 is left, 1 is right
-                                diag_dr, diag_dc = 0, 0
-                                side_wall_idx_1 = 0 # Wall index from opponent pos
-                                side_wall_idx_2 = 0 # Wall index from diagonal pos (coming back)
-
-                                if dir_index % 2 == 0: # Moving N/S, sidestep E/W
-                                    diag_dc = side_step_dir
-                                    side_wall_idx_1 = 1 if side_step_dir == 1 else 3 # E or W from opponent
-                                    side_wall_idx_2 = 3 if side_step_dir == 1 else 1 # W or E from diagonal
-                                else: # Moving E/W, sidestep N/S
-                                    diag_dr = side_step_dir
-                                    side_wall_idx_1 = 2 if side_step_dir == 1 else 0 # S or N from opponent
-                                    side_wall_idx_2 = 0 if side_step_dir == 1 else 2 # N or S from diagonal
-
-                                # Check wall from opponent to diagonal spot
-                                if neighbor_space.get_walls()[side_wall_idx_1] == 0:
-                                    diag_r, diag_c = nr + diag_dr, nc + diag_dc
-                                    if 0 <= diag_r < size and 0 <= diag_c < size:
-                                        # Check wall from diagonal spot back to opponent
-                                        if board_state.board[diag_r, diag_c].get_walls()[side_wall_idx_2] == 0:
-                                             # Check if diagonal spot is empty
-                                             if board_state.board[diag_r, diag_c].player is None:
-                                                 valid_targets.add((diag_r, diag_c))
-
-                    elif neighbor_space.player is None: # Normal move to empty space
-                        valid_targets.add((nr, nc))
-
-    return valid_targets
+    """ Calculates valid moves for a player, including jumps and diagonal sidesteps """
+    return set(board_state.legal_pawn_moves(player_num))
 
 
 def main():
@@ -241,8 +197,12 @@ def main():
     # --- Game Setup ---
     game_manager = GameManager()
     board_state = game_manager.board
-    # Make Player 2 the A* agent
-    game_manager.player2 = AStarAgent(player_num=2) # Or RandomMover(2)
+    # Player 2 is AI_AGENT; it thinks (and ponders) in a worker process (see agentWorker) so the window keeps repainting and accepting input
+    agent_cls, agent_kwargs = AI_AGENT
+    ai_worker = AgentWorker(agent_cls, 2, ponder_ms=AI_PONDER_MS, **agent_kwargs)
+    ai_worker.start() # start the process now rather than on the first AI turn
+    ai_action = None # the AI's answer, held until AI_MIN_DELAY_MS has passed
+    ai_started = 0
 
     game_state = PLAYER_TURN
     current_mode = MODE_MOVE
@@ -263,143 +223,149 @@ def main():
 
     running = True
     while running:
-        if game_state == PLAYER_TURN:
-            # --- Event Handling ---
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-
-                if game_state == PLAYER_TURN and event.type == pygame.MOUSEBUTTONDOWN:
-                    mouse_x, mouse_y = event.pos
-                    board_coords = get_board_coords(mouse_x, mouse_y)
-
-                    # Button Clicks
-                    if move_button_rect.collidepoint(mouse_x, mouse_y):
-                        current_mode = MODE_MOVE
-                        selected_piece_pos = None # Reset selection when changing mode
-                        possible_moves = set()
-                        message = "Player 1's Turn (Move)"
-                    elif wall_h_button_rect.collidepoint(mouse_x, mouse_y):
-                        current_mode = MODE_WALL_H
-                        selected_piece_pos = None
-                        possible_moves = set()
-                        message = "Player 1: Place Horizontal Wall (Click Top-Left)"
-
-                    elif wall_v_button_rect.collidepoint(mouse_x, mouse_y):
-                        current_mode = MODE_WALL_V
-                        selected_piece_pos = None
-                        possible_moves = set()
-                        message = "Player 1: Place Vertical Wall (Click Top-Left)"
-
-
-                    # Board Clicks
-                    elif board_coords:
-                        r, c = board_coords
-                        # Ensure player object exists before accessing attributes
-                        player1_obj = None
-                        if len(board_state.players) > 0:
-                            player1_obj = board_state.players[0]
-                            player1_pos = (player1_obj.Y, player1_obj.X) # Get current pos before potential move
+        # --- Event Handling ---
+        # events are handled on every frame, also while the AI thinks, so the window never stops responding
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+
+            # R starts a new game at any time; a move the AI is still working on is cancelled
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+                ai_worker.cancel()
+                ai_action = None
+                game_manager = GameManager()
+                board_state = game_manager.board
+                game_state = PLAYER_TURN
+                current_mode = MODE_MOVE
+                selected_piece_pos = None
+                possible_moves = set()
+                message = "Player 1's Turn (Move)"
+                winner = None
+            elif game_state == PLAYER_TURN and event.type == pygame.MOUSEBUTTONDOWN:
+                mouse_x, mouse_y = event.pos
+                board_coords = get_board_coords(mouse_x, mouse_y)
+
+                # Button Clicks
+                if move_button_rect.collidepoint(mouse_x, mouse_y):
+                    current_mode = MODE_MOVE
+                    selected_piece_pos = None # Reset selection when changing mode
+                    possible_moves = set()
+                    message = "Player 1's Turn (Move)"
+                elif wall_h_button_rect.collidepoint(mouse_x, mouse_y):
+                    current_mode = MODE_WALL_H
+                    selected_piece_pos = None
+                    possible_moves = set()
+                    message = "Player 1: Place Horizontal Wall (Click Top-Left)"
+
+                elif wall_v_button_rect.collidepoint(mouse_x, mouse_y):
+                    current_mode = MODE_WALL_V
+                    selected_piece_pos = None
+                    possible_moves = set()
+                    message = "Player 1: Place Vertical Wall (Click Top-Left)"
+
+
+                # Board Clicks
+                elif board_coords:
+                    r, c = board_coords
+                    # Ensure player object exists before accessing attributes
+                    player1_obj = None
+                    if len(board_state.players) > 0:
+                        player1_obj = board_state.players[0]
+                        player1_pos = (player1_obj.Y, player1_obj.X) # Get current pos before potential move
+                    else:
+                        player1_pos = None # Should not happen if game setup is correct
+
+                    if current_mode == MODE_MOVE:
+                        if selected_piece_pos is None:
+                            # Select Player 1's piece
+                            if player1_pos and (r, c) == player1_pos:
+                                selected_piece_pos = (r, c)
+                                possible_moves = get_valid_moves(board_state, 1)
+                                message = "Player 1: Select move destination"
+                                print(f"[DEBUG] Player 1 selected at {selected_piece_pos}. Possible moves: {possible_moves}") # DEBUG
                         else:
-                            player1_pos = None # Should not happen if game setup is correct
-
-                        if current_mode == MODE_MOVE:
-                            if selected_piece_pos is None:
-                                # Select Player 1's piece
-                                if player1_pos and (r, c) == player1_pos:
-                                    selected_piece_pos = (r, c)
-                                    possible_moves = get_valid_moves(board_state, 1)
-                                    message = "Player 1: Select move destination"
-                                    print(f"[DEBUG] Player 1 selected at {selected_piece_pos}. Possible moves: {possible_moves}") # DEBUG
-                            else:
-                                # Attempt to move selected piece
-                                if (r, c) in possible_moves:
-                                    # --- Start Debug Prints ---
-                                    print(f"[DEBUG] Attempting move from {selected_piece_pos} to {(r, c)}")
-                                    if player1_pos:
-                                        print(f"[DEBUG] State before teleport: Player obj at ({player1_obj.Y}, {player1_obj.X})")
-                                        print(f"[DEBUG] State before teleport: Old space ({player1_pos[0]},{player1_pos[1]}) player={board_state.board[player1_pos[0], player1_pos[1]].player}")
-                                        print(f"[DEBUG] State before teleport: New space ({r},{c}) player={board_state.board[r, c].player}")
-                                    # --- Execute move ---
-                                    board_state.teleport_player(1, r, c)
-                                    # --- Check State After ---
-                                    print(f"[DEBUG] State after teleport: Player obj at ({player1_obj.Y}, {player1_obj.X})")
-                                    print(f"[DEBUG] State after teleport: Old space ({player1_pos[0]},{player1_pos[1]}) player={board_state.board[player1_pos[0], player1_pos[1]].player}")
-                                    print(f"[DEBUG] State after teleport: New space ({r},{c}) player={board_state.board[r, c].player}")
-                                    # --- End Debug Prints ---
-
-                                    # Reset selection and check win condition
-                                    selected_piece_pos = None
-                                    possible_moves = set()
-                                    print("[DEBUG] Checking win condition for Player 1...") # DEBUG
-                                    if game_manager.is_goal_reached(1):
-                                        print("[DEBUG] Player 1 reached goal!") # DEBUG
-                                        winner = 1
-                                        game_state = GAME_OVER
-                                    else:
-                                        print("[DEBUG] Switching to AI turn.") # DEBUG
-                                        game_state = AI_TURN
-                                        message = "Player 2's Turn (AI)"
+                            # Attempt to move selected piece
+                            if (r, c) in possible_moves:
+                                # --- Start Debug Prints ---
+                                print(f"[DEBUG] Attempting move from {selected_piece_pos} to {(r, c)}")
+                                if player1_pos:
+                                    print(f"[DEBUG] State before teleport: Player obj at ({player1_obj.Y}, {player1_obj.X})")
+                                    print(f"[DEBUG] State before teleport: Old space ({player1_pos[0]},{player1_pos[1]}) player={board_state.board[player1_pos[0], player1_pos[1]].player}")
+                                    print(f"[DEBUG] State before teleport: New space ({r},{c}) player={board_state.board[r, c].player}")
+                                # --- Execute move ---
+                                board_state.teleport_player(1, r, c)
+                                # --- Check State After ---
+                                print(f"[DEBUG] State after teleport: Player obj at ({player1_obj.Y}, {player1_obj.X})")
+                                print(f"[DEBUG] State after teleport: Old space ({player1_pos[0]},{player1_pos[1]}) player={board_state.board[player1_pos[0], player1_pos[1]].player}")
+                                print(f"[DEBUG] State after teleport: New space ({r},{c}) player={board_state.board[r, c].player}")
+                                # --- End Debug Prints ---
+
+                                # Reset selection and check win condition
+                                selected_piece_pos = None
+                                possible_moves = set()
+                                print("[DEBUG] Checking win condition for Player 1...") # DEBUG
+                                if game_manager.is_goal_reached(1):
+                                    print("[DEBUG] Player 1 reached goal!") # DEBUG
+                                    winner = 1
+                                    game_state = GAME_OVER
                                 else:
-                                    # Clicked somewhere else, deselect
-                                    print(f"[DEBUG] Clicked invalid move target {(r,c)}. Deselecting.") # DEBUG
-                                    selected_piece_pos = None
-                                    possible_moves = set()
-                                    message = "Player 1's Turn (Move)"
-
-                        elif current_mode in [MODE_WALL_H, MODE_WALL_V]:
-                            # Attempt to place wall - use estimated top-left corner
-                            wall_r, wall_c = get_wall_coords_from_click(mouse_x, mouse_y)
-                            if wall_r is not None:
-                                corner1 = (wall_r, wall_c)
-                                corner2 = (wall_r + 1, wall_c + 1) # Diagonal corner
-                                direction = 0 if current_mode == MODE_WALL_H else 1
-
-                                # Use BoardState's place_wall validation
-                                if board_state.place_wall(corner1, corner2, direction):
-                                    # Wall placement successful
-                                    current_mode = MODE_MOVE # Switch back to move mode
-                                    if game_manager.is_goal_reached(1): # Should not happen after wall, but check
-                                        winner = 1
-                                        game_state = GAME_OVER
-                                    else:
-                                        game_state = AI_TURN
-                                        message = "Player 2's Turn (AI)"
+                                    print("[DEBUG] Switching to AI turn.") # DEBUG
+                                    game_state = AI_TURN
+                                    message = "Player 2's Turn (AI)"
+                            else:
+                                # Clicked somewhere else, deselect
+                                print(f"[DEBUG] Clicked invalid move target {(r,c)}. Deselecting.") # DEBUG
+                                selected_piece_pos = None
+                                possible_moves = set()
+                                message = "Player 1's Turn (Move)"
+
+                    elif current_mode in [MODE_WALL_H, MODE_WALL_V]:
+                        # Attempt to place wall - use estimated top-left corner
+                        wall_r, wall_c = get_wall_coords_from_click(mouse_x, mouse_y)
+                        if wall_r is not None:
+                            corner1 = (wall_r, wall_c)
+                            corner2 = (wall_r + 1, wall_c + 1) # Diagonal corner
+                            direction = 0 if current_mode == MODE_WALL_H else 1
+
+                            # Use BoardState's place_wall validation
+                            if board_state.place_wall(corner1, corner2, direction):
+                                # Wall placement successful
+                                current_mode = MODE_MOVE # Switch back to move mode
+                                if game_manager.is_goal_reached(1): # Should not happen after wall, but check
+                                    winner = 1
+                                    game_state = GAME_OVER
                                 else:
-                                    # Wall placement failed (invalid location, overlap, blocks path)
-                                    print(f"[DEBUG] Clicked invalid wall target {(r,c)}. Deselecting.") # DEBUG
-                                    message = "Player 1: Invalid wall placement!"
-                                    current_mode = MODE_MOVE # Go back to move mode
+                                    game_state = AI_TURN
+                                    message = "Player 2's Turn (AI)"
+                            else:
+                                # Wall placement failed (invalid location, overlap, blocks path)
+                                print(f"[DEBUG] Clicked invalid wall target {(r,c)}. Deselecting.") # DEBUG
+                                message = "Player 1: Invalid wall placement!"
+                                current_mode = MODE_MOVE # Go back to move mode
 
         # --- AI Turn ---
-        else:
-            pygame.time.wait(1000) # Small delay to see AI move
-            action, params = game_manager.player2.choose_action(board_state)
-            print(f"[AI Action] Player 2 chose: {action}, {params}") # Debug print
-
-            if action == "noop":
-                pass # AI does nothing
-            elif action == "move":
-                # Simple move - needs validation ideally, but A* should be valid
-                board_state.move_player(2, params["direction"])
-            elif action == "move_jumpaware":
-                 # A* gives target coords directly
-                 y, x = params["target"]
-                 board_state.teleport_player(2, y, x)
-            elif action == "wall":
-                c1 = params["corner1"]
-                c2 = params["corner2"]
-                direction = params["direction"]
-
-                print(f"[AI Wall] Placement succeeded at {c1} and {c2}, direction {direction}")
-
-            if game_manager.is_goal_reached(2):
-                winner = 2
-                game_state = GAME_OVER
-            else:
-                game_state = PLAYER_TURN
-                current_mode = MODE_MOVE # Reset player mode
-                message = "Player 1's Turn (Move)"
+        # the AI's move is computed in the worker process; the loop only checks for the answer and keeps drawing meanwhile
+        if game_state == AI_TURN:
+            if ai_action is None and not ai_worker.thinking:
+                ai_worker.request_action(board_state)
+                ai_started = pygame.time.get_ticks()
+            if ai_action is None:
+                ai_action = ai_worker.poll()
+
+            # the move is shown no sooner than AI_MIN_DELAY_MS after the turn started, so it can be seen
+            if ai_action is not None and pygame.time.get_ticks() - ai_started >= AI_MIN_DELAY_MS:
+                action, params = ai_action
+                ai_action = None
+                print(f"[AI Action] Player 2 chose: {action}, {params}") # Debug print
+                apply_ai_action(board_state, action, params)
+
+                if game_manager.is_goal_reached(2):
+                    winner = 2
+                    game_state = GAME_OVER
+                else:
+                    game_state = PLAYER_TURN
+                    current_mode = MODE_MOVE # Reset player mode
+                    message = "Player 1's Turn (Move)"
 
 
         # --- Drawing ---
@@ -408,8 +374,11 @@ def main():
 
         # Draw Info Text
         if game_state == GAME_OVER:
-            win_text = f"Player {winner} Wins!"
+            win_text = f"Player {winner} Wins! (R: new game)"
             text_surface = info_font.render(win_text, True, GREEN if winner == 1 else RED)
+        elif game_state == AI_TURN:
+            dots = "." * (pygame.time.get_ticks() // 400 % 4) # animated, so it is visible that the window is alive
+            text_surface = info_font.render(f"Player 2 (AI) is thinking{dots}", True, BLACK)
         else:
             text_surface = info_font.render(message, True, BLACK)
 
@@ -427,6 +396,7 @@ def main():
         # --- Limit Frame Rate ---
         clock.tick(FPS) # Waits if necessary to achieve the target FPS
 
+    ai_worker.close()
     pygame.quit()
     sys.exit()
 
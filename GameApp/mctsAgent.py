@@ -0,0 +1,334 @@
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from alphaBetaAgent import candidate_actions
+from boardState import BoardState
+
+# a node of the search tree: the position reached by playing action, with player_num being the player who played it
+# wins counts the playouts through this node won by player_num, so a parent picks the child that is best for the player moving there
+class Node:
+    def __init__(self, parent, action, player_num, key):
+        self.parent = parent
+        self.action = action
+        self.player_num = player_num
+        self.key = key # Zobrist hash of the position, used to find the node again when the tree is reused next turn
+        self.children = []
+        self.untried = None # actions not expanded yet; generated the first time the node is expanded
+        self.visits = 0
+        self.wins = 0.0
+
+    # UCT: average result plus an exploration bonus that shrinks as the child is visited
+    def best_child(self, exploration):
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: child.wins / child.visits + exploration * math.sqrt(log_visits / child.visits))
+
+
+# --------------------------------------------------------------
+# Monte Carlo tree search (UCT). Every iteration walks down the tree, expands one new action, plays a quick game from there,
+# and counts the result back up the tree. All of it happens on the real board through push/pop, so no board is ever copied.
+# The playout policy moves each pawn along its shortest path (the board's cached distance maps), and now and then puts a wall
+# across the opponent's next step. Playouts stop after playout_plies and are scored as a race on the remaining path lengths.
+# The subtree under the chosen move is kept, so the next turn starts from whatever was already searched for the reply that was played.
+# ponder() grows that subtree further while the opponent is thinking (agentWorker calls it between moves).
+#
+# With workers > 1 the search runs in a pool of worker processes, which get the board as BoardState.serialize() output:
+#   - root parallelism (default): every worker grows its own tree from the current position, and the visit counts of the
+#     root moves are added up across workers to pick the move. Trees live in the workers, so they are not reused between turns
+#   - leaf parallelism (leaf_batch > 1): the tree stays here, leaf_batch leaves are selected at a time (each selection counts as a
+#     visit right away, so the next one is steered elsewhere) and their playouts run in the workers as one batch
+# --------------------------------------------------------------
+class MCTSAgent:
+    def __init__(self, player_num, iterations=1000, time_limit_ms=None, exploration=1.4, wall_chance=0.1, playout_plies=20, wall_reach=4, seed=None,
+                 workers=1, leaf_batch=1):
+        self.player_num = player_num
+        self.opponent_num = 2 if player_num == 1 else 1
+        self.iterations = iterations
+        self.time_limit_ms = time_limit_ms # when set, search until the budget runs out instead of for a fixed number of iterations
+        self.exploration = exploration
+        self.wall_chance = wall_chance
+        self.playout_plies = playout_plies
+        self.wall_reach = wall_reach
+        self.random = random.Random(seed)
+        self.workers = workers
+        self.leaf_batch = leaf_batch
+        self.pool = None # created on first use, see executor
+        self.root = None
+        self.last_search = None # {"iterations", "reused_visits", "time_ms"} of the latest choose_action call
+
+    def choose_action(self, board_state):
+        if self.workers > 1 and self.leaf_batch <= 1:
+            return self.choose_root_parallel(board_state)
+        root = self.search(board_state)
+        if not root.children:
+            self.root = None
+            return ("noop", {})
+        best = max(root.children, key=lambda child: child.visits)
+        best.parent = None # the rest of the tree is no longer needed, and ponder backs up results only as far as this node
+        self.root = best
+        return best.action
+
+    # grows the tree for the current position for the configured iterations or time, and returns its root
+    def search(self, board_state):
+        start = time.perf_counter()
+        turn = board_state.turn
+        board_state.set_turn(self.player_num) # the hash includes the side to move, which callers moving pawns directly do not update
+
+        root = self.reuse_root(board_state.zobrist)
+        reused = root.visits
+        iterations = 0
+        deadline = start + self.time_limit_ms / 1000 if self.time_limit_ms is not None else None
+        while (iterations < self.iterations) if deadline is None else (time.perf_counter() < deadline):
+            if self.workers > 1:
+                iterations += self.iterate_batch(board_state, root)
+            else:
+                self.iterate(board_state, root)
+                iterations += 1
+        board_state.set_turn(turn)
+
+        self.last_search = {"iterations": iterations, "reused_visits": reused, "time_ms": (time.perf_counter() - start) * 1000}
+        return root
+
+    # pondering: keeps growing the tree under the move just played while the opponent thinks, for up to time_limit_ms; all of the
+    # opponent's replies share that tree, so whichever one is played, the next choose_action starts from a subtree that already has visits
+    # board_state must be the position after that move (it is left unchanged); returns the number of iterations run, 0 if there is nothing to grow
+    def ponder(self, board_state, time_limit_ms):
+        if self.root is None:
+            return 0
+        turn = board_state.turn
+        board_state.set_turn(self.opponent_num)
+        iterations = 0
+        if board_state.zobrist == self.root.key:
+            deadline = time.perf_counter() + time_limit_ms / 1000
+            while time.perf_counter() < deadline:
+                self.iterate(board_state, self.root)
+                iterations += 1
+        board_state.set_turn(turn)
+        return iterations
+
+    # root parallelism: independent trees in the worker processes, merged by adding up the visits of each root move
+    def choose_root_parallel(self, board_state):
+        start = time.perf_counter()
+        turn = board_state.turn
+        board_state.set_turn(self.player_num)
+        data = board_state.serialize()
+        board_state.set_turn(turn)
+
+        seeds = [self.random.getrandbits(32) for _ in range(self.workers)]
+        totals, actions = {}, {}
+        iterations = 0
+        for stats, worker_iterations in self.executor().map(search_in_worker, repeat(data), repeat(self.player_num), repeat(self.settings()), seeds):
+            iterations += worker_iterations
+            for action, visits, wins in stats:
+                key = action_key(action)
+                actions[key] = action
+                totals[key] = totals.get(key, 0) + visits
+
+        self.last_search = {"iterations": iterations, "reused_visits": 0, "time_ms": (time.perf_counter() - start) * 1000}
+        if not totals:
+            return ("noop", {})
+        return actions[max(totals, key=totals.get)]
+
+    # the constructor arguments a worker process needs to search or play out the same way as this agent
+    def settings(self):
+        return {"iterations": self.iterations, "time_limit_ms": self.time_limit_ms, "exploration": self.exploration,
+                "wall_chance": self.wall_chance, "playout_plies": self.playout_plies, "wall_reach": self.wall_reach}
+
+    def executor(self):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self.pool
+
+    # shuts down the worker processes, if any were started
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    # the node for the current position: a reply to our last move that is already in the tree, or a fresh root
+    def reuse_root(self, key):
+        if self.root is not None:
+            for child in self.root.children:
+                if child.key == key:
+                    child.parent = None
+                    return child
+        return Node(None, None, self.opponent_num, key)
+
+    # one selection / expansion / playout / backpropagation pass; the board is back where it started afterwards
+    def iterate(self, board_state, root):
+        node, pushed = self.descend(board_state, root)
+        winner = self.winner(board_state)
+        if winner is None:
+            winner = self.playout(board_state, 2 if node.player_num == 1 else 1)
+        self.backpropagate(node, winner)
+        for _ in range(pushed):
+            board_state.pop()
+
+    # leaf parallelism: selects up to leaf_batch leaves, plays them out in the worker processes and backs up the results
+    # returns the number of leaves handled
+    def iterate_batch(self, board_state, root):
+        pending = []
+        for _ in range(self.leaf_batch):
+            node, pushed = self.descend(board_state, root)
+            winner = self.winner(board_state)
+            if winner is None:
+                pending.append((node, board_state.serialize()))
+                self.backpropagate(node, None) # counted as visited now so the next selection in this batch goes elsewhere
+            else:
+                self.backpropagate(node, winner)
+            for _ in range(pushed):
+                board_state.pop()
+
+        if pending:
+            seeds = [self.random.getrandbits(32) for _ in pending]
+            chunk = -(-len(pending) // self.workers)
+            winners = self.executor().map(playout_in_worker, [data for _, data in pending], seeds, repeat(self.settings()), chunksize=chunk)
+            for (node, _), winner in zip(pending, winners):
+                self.backpropagate(node, winner, visited=True)
+        return self.leaf_batch
+
+    # selection and expansion: follows UCT down to a node with untried actions and expands one of them
+    # returns the node reached and the number of actions pushed to get there
+    def descend(self, board_state, root):
+        node = root
+        pushed = 0
+        while node.untried is not None and not node.untried and node.children:
+            node = node.best_child(self.exploration)
+            board_state.push(node.action, node.player_num)
+            pushed += 1
+
+        if self.winner(board_state) is None:
+            to_move = 2 if node.player_num == 1 else 1
+            if node.untried is None:
+                node.untried = candidate_actions(board_state, to_move, self.wall_reach)
+            while node.untried:
+                action = node.untried.pop(0)
+                if board_state.push(action, to_move):
+                    pushed += 1
+                    child = Node(node, action, to_move, board_state.zobrist)
+                    node.children.append(child)
+                    node = child
+                    break
+        return node, pushed
+
+    # adds the result of a playout to every node from node up to the root; visited is True when the visit was already counted
+    def backpropagate(self, node, winner, visited=False):
+        while node is not None:
+            if not visited:
+                node.visits += 1
+            if winner == node.player_num:
+                node.wins += 1
+            node = node.parent
+
+    # plays the cheap policy from the current position and returns the winner; the board is restored before returning
+    def playout(self, board_state, to_move):
+        pushed = 0
+        winner = self.winner(board_state)
+        while winner is None and pushed < self.playout_plies:
+            if board_state.push(self.playout_action(board_state, to_move), to_move):
+                pushed += 1
+            else:
+                board_state.push(self.step_action(board_state, to_move), to_move)
+                pushed += 1
+            to_move = 2 if to_move == 1 else 1
+            winner = self.winner(board_state)
+        if winner is None:
+            winner = self.race_winner(board_state, to_move)
+        for _ in range(pushed):
+            board_state.pop()
+        return winner
+
+    # usually the step along the shortest path; with probability wall_chance, a wall across the opponent's next step instead
+    def playout_action(self, board_state, player_num):
+        if self.random.random() < self.wall_chance:
+            opponent_num = 2 if player_num == 1 else 1
+            step = board_state.next_step(opponent_num)
+            if step is not None:
+                opponent = board_state.players[opponent_num - 1]
+                y, x = min(step[0], opponent.Y), min(step[1], opponent.X)
+                if step[0] != opponent.Y: # the opponent moves vertically, a horizontal wall below row y blocks it
+                    r, c, direction = y, self.random.choice((x - 1, x)), 0
+                else:
+                    r, c, direction = self.random.choice((y - 1, y)), x, 1
+                if 0 <= r < board_state.size - 1 and 0 <= c < board_state.size - 1:
+                    return ("wall", {"corner1": (r, c), "corner2": (r + 1, c + 1), "direction": direction})
+        return self.step_action(board_state, player_num)
+
+    # the legal pawn move that gets closest to the goal row (ties broken at random), or a pass if the pawn is stuck
+    def step_action(self, board_state, player_num):
+        dist = board_state.distance_map(player_num)
+        best, best_dist = [], None
+        for y, x in board_state.legal_pawn_moves(player_num):
+            d = dist[y][x]
+            if d is None:
+                continue
+            if best_dist is None or d < best_dist:
+                best, best_dist = [(y, x)], d
+            elif d == best_dist:
+                best.append((y, x))
+        if not best:
+            return ("noop", {})
+        return ("move_jumpaware", {"target": self.random.choice(best)})
+
+    # the player standing on its goal row, if any
+    def winner(self, board_state):
+        for player_num in (1, 2):
+            if board_state.players[player_num - 1].Y == board_state.goal_row(player_num):
+                return player_num
+        return None
+
+    # who wins if both players just walk their shortest paths from here; the side to move wins ties
+    def race_winner(self, board_state, to_move):
+        other = 2 if to_move == 1 else 1
+        mine = board_state.goal_distance(to_move)
+        theirs = board_state.goal_distance(other)
+        if mine is None:
+            return other
+        if theirs is None or mine <= theirs:
+            return to_move
+        return other
+
+
+# a hashable stand-in for an action, so the same move from different workers can be matched up
+def action_key(action):
+    kind, params = action
+    return (kind, tuple(sorted(params.items())))
+
+# worker process side of root parallelism: searches its own tree and returns ([(action, visits, wins) per root move], iterations)
+def search_in_worker(data, player_num, settings, seed):
+    agent = MCTSAgent(player_num, seed=seed, **settings)
+    root = agent.search(BoardState.from_serialized(data))
+    return [(child.action, child.visits, child.wins) for child in root.children], agent.last_search["iterations"]
+
+# each worker process keeps one board and moves it between the positions it is sent, placing and removing only the walls that differ,
+# since building a BoardState costs far more than a playout
+_worker_board = None
+_worker_walls = [] # (row, col, direction) and apply_wall undo record of each wall on _worker_board, in placement order
+
+def load_worker_board(data):
+    global _worker_board, _worker_walls
+    size, pawns, walls, turn = data
+    if _worker_board is None or _worker_board.size != size or len(_worker_board.players) != len(pawns):
+        _worker_board = BoardState(size=size, playerCount=len(pawns))
+        _worker_walls = []
+    board = _worker_board
+    shared = 0
+    while shared < min(len(walls), len(_worker_walls)) and walls[shared] == _worker_walls[shared][0]:
+        shared += 1
+    while len(_worker_walls) > shared:
+        board.undo_wall(_worker_walls.pop()[1])
+    for r, c, direction in walls[shared:]:
+        _worker_walls.append(((r, c, direction), board.apply_wall(board.get_wall(r, c, direction))))
+    for i, (y, x) in enumerate(pawns):
+        board.teleport_player(i + 1, y, x)
+    for p in board.players:
+        board.board[p.Y, p.X].insert_player(p.PlayerNo)
+    board.set_turn(turn)
+    return board
+
+# worker process side of leaf parallelism: one playout from the sent position, returns the winner
+def playout_in_worker(data, seed, settings):
+    board = load_worker_board(data)
+    agent = MCTSAgent(board.turn, seed=seed, **settings)
+    return agent.playout(board, board.turn)
@@ -0,0 +1,45 @@
+# Pawn move generation shared by both board backends, a_star_path, the agents and the UI.
+# Boards describe walls as four "blocked" bitboards ([N,E,S,W], bit y*size + x set when that space cannot move that way, outside edges included),
+# so the open directions of a space are read straight from the bits, and the geometry below is precomputed once per board size.
+
+STEPS = [(-1, 0), (0, 1), (1, 0), (0, -1)] # N, E, S, W
+_move_tables = {}
+
+# for every space k and direction d, the index of the space one step away (or -1 off the board)
+def step_table(size):
+    if size not in _move_tables:
+        table = []
+        for y in range(size):
+            for x in range(size):
+                row = []
+                for dy, dx in STEPS:
+                    ny, nx = y + dy, x + dx
+                    row.append(ny * size + nx if 0 <= ny < size and 0 <= nx < size else -1)
+                table.append(row)
+        _move_tables[size] = table
+    return _move_tables[size]
+
+# the squares (as space indices) a pawn on space k can move to, following the Quoridor rules:
+#   - step to an open neighboring space
+#   - if another pawn is on it, jump straight over that pawn when nothing blocks the space behind it
+#   - otherwise (wall, board edge or pawn behind it) step diagonally to either side of that pawn, if those sides are open
+# occupied is a bitmask of the spaces holding the other pawns
+def pawn_moves(size, blocked, occupied, k):
+    step = step_table(size)
+    moves = []
+    for d in range(4):
+        if (blocked[d] >> k) & 1:
+            continue
+        t = step[k][d]
+        if not (occupied >> t) & 1:
+            moves.append(t)
+            continue
+        if not (blocked[d] >> t) & 1 and not (occupied >> step[t][d]) & 1:
+            moves.append(step[t][d])
+            continue
+        for side in ((d + 1) % 4, (d + 3) % 4):
+            if not (blocked[side] >> t) & 1:
+                s = step[t][side]
+                if s != k and not (occupied >> s) & 1 and s not in moves:
+                    moves.append(s)
+    return moves
@@ -1,6 +1,8 @@
 
 # the location and designated turn order of a player on the board
 class Player:
+    __slots__ = ("X", "Y", "PlayerNo") # no per-instance __dict__, see Space
+
     def __init__(self, x, y, num):
         self.X = x
         self.Y = y
@@ -1,15 +1,22 @@
 import player
 
+STEP_DIRECTIONS = {(-1, 0): 0, (0, 1): 1, (1, 0): 2, (0, -1): 3} # (dy, dx) of a neighboring space -> its [N,E,S,W] index
+WALL_LISTS = [[1 - ((mask >> d) & 1) for d in range(4)] for mask in range(16)] # get_walls output for every open mask
+
 # a space on the board, which keeps track of neighboring spaces that can be reached from it (i.e. not blocked by a wall)
 class Space:
+    __slots__ = ("pos", "neighbors", "player", "open") # no per-instance __dict__; boards hold n*n of these and search trees hold many boards
+
     def __init__(self,y,x):
         self.pos = (y,x) # the space's designated position on the board
         self.neighbors = [] # the spaces that can be reached from this space; initially empty, since we have not necessarily created all its neighbors yet
         self.player = None # the number of the player on this space; does not contain the player object
+        self.open = 0 # bit d is set when direction d ([N,E,S,W]) leads to a neighbor; kept in step with the neighbors list
 
     # adds a new space to the list of neighbors
     def insert_neighbor(self, space):
         self.neighbors.append(space)
+        self.open |= 1 << self.direction_to(space)
     
     # sets this space as the location of the given player number
     def insert_player(self, playerNo):
@@ -21,20 +28,17 @@ class Space:
         self.player = None
         return temp
     
-    # get the directions that are blocked from this space; checks each neighbor to see which direction they're in, and marks that direction in the list [N,E,S,W] as unblocked
+    # get the directions that are blocked from this space as a list [N,E,S,W], with 1 for blocked and 0 for open; read from the open mask
     def get_walls(self):
-        walls = [1, 1, 1, 1]  # Start assuming walls in all directions
-        y, x = self.pos
-        for n in self.neighbors:
-            if n.pos == (y-1, x):
-                walls[0] = 0  # North is open
-            if n.pos == (y, x+1):
-                walls[1] = 0  # East is open
-            if n.pos == (y+1, x):
-                walls[2] = 0  # South is open
-            if n.pos == (y, x-1):
-                walls[3] = 0  # West is open
-        return walls
+        return list(WALL_LISTS[self.open])
+
+    # the direction ([N,E,S,W] index) of a space next to this one
+    def direction_to(self, space):
+        return STEP_DIRECTIONS[(space.pos[0] - self.pos[0], space.pos[1] - self.pos[1])]
+
+    # whether the neighbor in the given direction can be reached from this space
+    def is_open(self, direction):
+        return (self.open >> direction) & 1 == 1
 
     # removes the desired neighboring space from the list of neighbors
     def remove_neighbor(self, neighbor):
@@ -43,6 +47,7 @@ class Space:
         #     print(n.pos)
         # print("\n")
         self.neighbors.remove(neighbor)
+        self.open &= ~(1 << self.direction_to(neighbor))
 
 
 
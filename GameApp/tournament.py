@@ -0,0 +1,151 @@
+import argparse
+import contextlib
+import inspect
+import io
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from boardState import BoardState
+from aStarAgent import AStarAgent
+from bfsAgent import BFSAgent
+from alphaBetaAgent import AlphaBetaAgent
+from mctsAgent import MCTSAgent
+from GameManager import RandomMover
+
+# --------------------------------------------------------------
+# Tournament runner: plays many games between two agent classes on a pool of worker processes and sums up the results.
+# Every game is seeded from (seed, game_id) alone, so a game plays out the same way no matter which worker runs it or how many
+# workers there are, and any single game can be replayed with play_game. Starting columns are randomized like in the test scripts.
+#
+# From the command line:
+#   python tournament.py astar bfs --games 1000 --size 9 --workers 8
+# --------------------------------------------------------------
+
+AGENTS = {
+    "astar": AStarAgent,
+    "bfs": BFSAgent,
+    "alphabeta": AlphaBetaAgent,
+    "mcts": MCTSAgent,
+    "random": RandomMover,
+}
+
+# plays one game and returns its result: {"game_id", "winner" (1, 2 or "Draw"), "reason", "turns", "invalid_actions", "move_times"}
+# move_times holds, per player, the seconds each choose_action call took; agents whose constructor takes a seed get one derived from the game's seed
+# actions are refereed with the board's own rules: an illegal pawn move or wall loses the turn, like a failed wall placement in GameManager
+def play_game(game_id, agent1_cls, agent2_cls, size=9, max_turns=150, seed=0):
+    rng = random.Random(f"{seed}-{game_id}")
+    random.seed(rng.random()) # for agents drawing from the global generator, e.g. RandomMover
+
+    board = BoardState(size=size)
+    board.teleport_player(1, 0, rng.randrange(size))
+    board.teleport_player(2, size - 1, rng.randrange(size))
+
+    agents = {}
+    for player_num, cls in ((1, agent1_cls), (2, agent2_cls)):
+        if "seed" in inspect.signature(cls).parameters:
+            agents[player_num] = cls(player_num, seed=rng.getrandbits(32))
+        else:
+            agents[player_num] = cls(player_num)
+
+    result = {"game_id": game_id, "winner": "Draw", "reason": f"Max turns ({max_turns}) reached", "turns": 0,
+              "invalid_actions": {1: 0, 2: 0}, "move_times": {1: [], 2: []}}
+    for turn in range(max_turns * 2):
+        player_num = turn % 2 + 1
+        winner = next((p for p in (1, 2) if board.players[p - 1].Y == board.goal_row(p)), None)
+        if winner is not None:
+            result["winner"], result["reason"] = winner, "Goal Reached"
+            break
+
+        start = time.perf_counter()
+        action = agents[player_num].choose_action(board)
+        result["move_times"][player_num].append(time.perf_counter() - start)
+        if not is_legal(board, action, player_num) or not board.push(action, player_num):
+            result["invalid_actions"][player_num] += 1
+            board.push(("noop", {}), player_num)
+        if player_num == 2:
+            result["turns"] += 1
+    else:
+        winner = next((p for p in (1, 2) if board.players[p - 1].Y == board.goal_row(p)), None)
+        if winner is not None:
+            result["winner"], result["reason"] = winner, "Goal Reached"
+
+    for agent in agents.values():
+        if hasattr(agent, "close"):
+            agent.close()
+    return result
+
+# whether a pawn action is a legal move for the player; walls are checked by push itself
+def is_legal(board, action, player_num):
+    kind, params = action
+    if kind == "move":
+        player = board.players[player_num - 1]
+        dy, dx = [(-1, 0), (0, 1), (1, 0), (0, -1)][params["direction"]]
+        return (player.Y + dy, player.X + dx) in board.legal_pawn_moves(player_num)
+    if kind == "move_jumpaware":
+        return tuple(params["target"]) in board.legal_pawn_moves(player_num)
+    return kind in ("wall", "noop")
+
+# play_game with the agents' progress prints silenced, for the worker processes
+def play_quietly(game_id, agent1_cls, agent2_cls, size, max_turns, seed):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return play_game(game_id, agent1_cls, agent2_cls, size, max_turns, seed)
+
+# plays games 1..games (or the given game_ids) over a pool of worker processes (all cores by default); yields each game's result
+# as soon as it finishes, so a slow game does not hold back the others. Results come in completion order: sort by "game_id" for id order
+def run_tournament(agent1_cls, agent2_cls, games=100, size=9, max_turns=150, seed=0, workers=None, game_ids=None):
+    game_ids = list(range(1, games + 1) if game_ids is None else game_ids)
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_quietly, game_id, agent1_cls, agent2_cls, size, max_turns, seed) for game_id in game_ids]
+        for future in as_completed(futures):
+            yield future.result()
+
+# win rates, turn counts and per-move latency over a list of game results
+def summarize(results):
+    total = len(results)
+    summary = {"games": total, "draws": sum(1 for r in results if r["winner"] == "Draw")}
+    decided = [r["turns"] for r in results if r["winner"] != "Draw"]
+    summary["average_turns"] = sum(decided) / len(decided) if decided else None
+    for player_num in (1, 2):
+        times = sorted(t for r in results for t in r["move_times"][player_num])
+        wins = sum(1 for r in results if r["winner"] == player_num)
+        summary[f"player{player_num}"] = {
+            "wins": wins,
+            "win_rate": wins / total if total else 0.0,
+            "invalid_actions": sum(r["invalid_actions"][player_num] for r in results),
+            "moves": len(times),
+            "average_move_ms": sum(times) / len(times) * 1000 if times else None,
+            "p95_move_ms": times[int(len(times) * 0.95)] * 1000 if times else None,
+            "max_move_ms": times[-1] * 1000 if times else None,
+        }
+    summary["draw_rate"] = summary["draws"] / total if total else 0.0
+    return summary
+
+def print_summary(summary, name1, name2):
+    print(f"\n--- Summary ---")
+    print(f"Total Games: {summary['games']}")
+    for player_num, name in ((1, name1), (2, name2)):
+        p = summary[f"player{player_num}"]
+        print(f"Player {player_num} ({name}) Wins: {p['wins']} ({p['win_rate'] * 100:.2f}%)")
+        if p["moves"]:
+            print(f"    move time avg {p['average_move_ms']:.2f} ms, p95 {p['p95_move_ms']:.2f} ms, max {p['max_move_ms']:.2f} ms; invalid actions: {p['invalid_actions']}")
+    print(f"Draws: {summary['draws']} ({summary['draw_rate'] * 100:.2f}%)")
+    if summary["average_turns"] is not None:
+        print(f"Average turns in decided games: {summary['average_turns']:.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play a tournament between two agents")
+    parser.add_argument("agent1", choices=AGENTS)
+    parser.add_argument("agent2", choices=AGENTS)
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--size", type=int, default=9)
+    parser.add_argument("--max-turns", type=int, default=150)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    args = parser.parse_args()
+
+    start = time.time()
+    results = list(run_tournament(AGENTS[args.agent1], AGENTS[args.agent2], args.games, args.size, args.max_turns, args.seed, args.workers))
+    print_summary(summarize(results), args.agent1, args.agent2)
+    print(f"Finished in {time.time() - start:.2f} seconds")
@@ -2,8 +2,12 @@
 # each wall "blocks" two pairs of spaces when activated by removing those spaces from each other's list of neighbors
 # walls that overlap with each other cannot both be placed; when a wall is placed, its neighbors are marked as 'set' as well, and cannot be activated
 class Wall:
-    def __init__(self, spaces):
+    __slots__ = ("spaces", "pos", "direction", "set", "neighbors") # no per-instance __dict__, see Space
+
+    def __init__(self, spaces, pos=None, direction=None):
         self.spaces = spaces # the list of spaces that this wall will block when active
+        self.pos = pos # (row, col) of the top-left space of the 2x2 block this wall sits in
+        self.direction = direction # 0 for horizontal, 1 for vertical
         self.set = False # whether or not this wall is active
         self.neighbors = [] # the list of walls that block some of the same spaces as this wall; current board logic only considers walls in same direction (horizontal or vertical) as each other
 
@@ -0,0 +1,17 @@
+import random
+
+# Zobrist keys, one random 64-bit number per (player, square), per (direction, wall slot) and per side to move.
+# A position's hash is the XOR of the keys of everything on the board, so each move only XORs a key out and a key in.
+# The keys are generated once per board size from a fixed seed, so hashes are stable between runs and processes.
+ZOBRIST_SEED = 440
+_zobrist_tables = {}
+
+def zobrist_keys(size):
+    if size not in _zobrist_tables:
+        rng = random.Random(ZOBRIST_SEED + size)
+        _zobrist_tables[size] = {
+            "pawn": [[rng.getrandbits(64) for _ in range(size * size)] for _ in range(4)], # indexed [player_num-1][y*size + x]
+            "wall": [[rng.getrandbits(64) for _ in range((size-1) * (size-1))] for _ in range(2)], # indexed [direction][r*(size-1) + c]
+            "turn": [rng.getrandbits(64) for _ in range(4)], # indexed [player_num-1]
+        }
+    return _zobrist_tables[size]
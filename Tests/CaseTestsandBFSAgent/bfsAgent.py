@@ -1,4 +1,3 @@
-import collections
 from astarpathfinding import a_star_path
 
 # --------------------------------------------------------------
@@ -17,31 +16,12 @@ class BFSAgent:
         shortest_path = a_star_path(board_state, self.player_num)
 
         if not shortest_path:
-            y, x = board_state.players[self.player_num - 1].Y, board_state.players[self.player_num - 1].X
-            current_space = board_state.board[y][x]
-            walls = current_space.get_walls()
-            goal_direction = 2 if self.player_num == 1 else 0
-            if walls[goal_direction] == 0:
-                 # Check if the target space is valid (within bounds)
-                 dy, dx = [( -1, 0), (0, 1), (1, 0), (0, -1)][goal_direction]
-                 ny, nx = y + dy, x + dx
-                 if 0 <= ny < board_state.size and 0 <= nx < board_state.size:
-                     # Check if the target space is occupied by the opponent
-                     target_space = board_state.board[ny][nx]
-                     if target_space.player is None:
-                          return ("move_jumpaware", {"target": (ny, nx)})
-
-            # If direct move isn't possible, try any valid move
-            for direction, (dy, dx) in enumerate([(-1, 0), (0, 1), (1, 0), (0, -1)]):
-                 if walls[direction] == 0:
-                     ny, nx = y + dy, x + dx
-                     if 0 <= ny < board_state.size and 0 <= nx < board_state.size:
-                         target_space = board_state.board[ny][nx]
-                         if target_space.player is None:
-                            return ("move_jumpaware", {"target": (ny, nx)})
-
-            # If absolutely no move possible
-            return ("noop", {})
+            # No path to the goal: take whichever legal move gets closest to the goal row, or pass if there is none
+            moves = board_state.legal_pawn_moves(self.player_num)
+            if not moves:
+                return ("noop", {})
+            goal_row = board_state.goal_row(self.player_num)
+            return ("move_jumpaware", {"target": min(moves, key=lambda pos: abs(goal_row - pos[0]))})
 
         if len(shortest_path) < 2:
             # Already at the goal or cannot move
@@ -50,4 +30,3 @@ class BFSAgent:
         # The next position is the second element in the path
         next_pos = shortest_path[1]
         return ("move_jumpaware", {"target": next_pos})
-
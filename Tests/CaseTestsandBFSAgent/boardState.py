@@ -3,6 +3,7 @@ import numpy as np
 from player import Player
 from space import Space
 from wall import Wall
+from pawnMoves import pawn_moves
 
 #the board is a 9X9 grid of tuples ([int], int).
 #   -The first element is the wall state array, the second number is the player number
@@ -47,6 +48,7 @@ class BoardState:
             self.players = input.players
             self.hWalls = input.hWalls
             self.vWalls = input.vWalls
+            self.wall_pairs = input.wall_pairs
 
         else:
             if size > 1 and size % 2 != 0:
@@ -91,6 +93,14 @@ class BoardState:
                     self.hWalls.append(hWall)
                     self.vWalls.append(vWall)
 
+        # wall_pairs maps (pos1, pos2, direction) for every pair of spaces a wall touches to the first wall containing both, so find_wall is a single lookup
+        self.wall_pairs = {}
+        for direction, walls in enumerate((self.hWalls, self.vWalls)):
+            for wall in walls:
+                for s1 in wall.spaces:
+                    for s2 in wall.spaces:
+                        self.wall_pairs.setdefault((s1.pos, s2.pos, direction), wall)
+
     # initializes each Player object; called in the constructor. Defaults to 2 players if playerCount is more than 4 or less than 2
     # Each player starts in the middle of one side of the board. Player objects store their location, and spaces on the board store the player
     # players are initialized with (x,y,playerNo), but all other instances of coordinates are reversed (y,x) for printing purposes
@@ -135,17 +145,38 @@ class BoardState:
 
     # helper function, returns the first wall in the list that contains the two desired spaces. 
     # Direction is boolean, determines if we check the horizontal wall list (0) or vertical wall list (1)
-    # No return if wall is not found
+    # Returns None if wall is not found
     def find_wall(self, space1, space2,direction)->Wall:
-        if direction == 0:
-            for h in self.hWalls:
-                if space1 in h.spaces and space2 in h.spaces:
-                    return h
-
-        elif direction == 1:
-            for v in self.vWalls:
-                if space1 in v.spaces and space2 in v.spaces:
-                    return v
+        return self.wall_pairs.get((space1.pos, space2.pos, direction))
+
+    # returns the goal row of a player; player 1 heads for the south edge, player 2 for the north edge (same as a_star_path)
+    def goal_row(self, player_num):
+        if player_num == 1:
+            return self.size - 1
+        elif player_num == 2:
+            return 0
+        raise ValueError("Invalid player number (should be 1 or 2)")
+
+    # the "blocked" bitboards pawnMoves works on ([N,E,S,W], bit y*size + x set when that space cannot move that way, outside edges included)
+    # this board keeps no bitboards, so they are read from the spaces' get_walls() each time
+    def blocked_bits(self):
+        blocked = [0, 0, 0, 0]
+        for r in range(self.size):
+            for c in range(self.size):
+                for d, wall in enumerate(self.board[r, c].get_walls()):
+                    if wall:
+                        blocked[d] |= 1 << (r * self.size + c)
+        return blocked
+
+    # returns every square the player's pawn can move to this turn as (y,x) tuples, jumps and diagonal sidesteps included,
+    # from the same move generator as GameApp's BoardState.legal_pawn_moves
+    def legal_pawn_moves(self, player_num, pos=None):
+        y, x = pos if pos is not None else (self.players[player_num - 1].Y, self.players[player_num - 1].X)
+        occupied = 0
+        for p in self.players:
+            if p.PlayerNo != player_num:
+                occupied |= 1 << (p.Y * self.size + p.X)
+        return [divmod(k, self.size) for k in pawn_moves(self.size, self.blocked_bits(), occupied, y * self.size + x)]
 
     # moves the player 1 space in the desired direction; does not check for walls
     # external game logic should check for valid moves and players before calling this function
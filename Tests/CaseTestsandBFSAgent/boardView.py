@@ -0,0 +1,49 @@
+import copy
+
+# the BoardState methods that change the board; anything else is treated as a read
+MUTATING_METHODS = frozenset({
+    "place_wall", "teleport_player", "move_player",
+    "push", "pop", "try_wall", "apply_wall", "undo_wall", "set_turn",
+})
+
+# --------------------------------------------------------------
+# A copy-on-write view of a BoardState, handed to agents instead of copy.deepcopy(board).
+# Reads go straight to the real board. The first call to a mutating method (or attribute assignment) copies the board privately,
+# and from then on the view works on that copy, so an agent can still try walls or moves without touching the real board,
+# and only the agents that actually do so pay for a copy.
+# With read_only=True, mutating calls raise TypeError instead of copying.
+#
+# Objects read from the view before the copy (e.g. board.board[r][c] spaces or players) belong to the real board and must be
+# treated as read-only; the view cannot intercept changes made to them directly.
+# --------------------------------------------------------------
+class BoardView:
+    def __init__(self, board, read_only=False):
+        object.__setattr__(self, "_board", board)
+        object.__setattr__(self, "_read_only", read_only)
+        object.__setattr__(self, "_copied", False)
+
+    # isinstance(view, BoardState) is True, so code such as BoardState(board_state) accepts a view like the board itself
+    @property
+    def __class__(self):
+        return type(self._board)
+
+    def __getattr__(self, name):
+        if name in MUTATING_METHODS:
+            return getattr(self._writable(name), name)
+        return getattr(self._board, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._writable(name), name, value)
+
+    def __str__(self):
+        return str(self._board)
+
+    # the board to change: the private copy, made on first use
+    def _writable(self, name):
+        if self._read_only:
+            raise TypeError(f"cannot use {name} on a read-only board view")
+        if not self._copied:
+            board = self._board
+            object.__setattr__(self, "_board", board.clone() if hasattr(board, "clone") else copy.deepcopy(board))
+            object.__setattr__(self, "_copied", True)
+        return self._board
@@ -0,0 +1,93 @@
+import gzip
+import json
+import os
+import zlib
+
+# --------------------------------------------------------------
+# Streaming game logs: one game per line (JSON Lines), written and flushed as soon as each game finishes,
+# so memory does not grow with the number of games and a crash only loses the game that was being played.
+# A path ending in ".gz" is gzip-compressed. In resume mode the games already in the file are kept and their ids can be skipped.
+# --------------------------------------------------------------
+
+def open_log(path, mode):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+# yields the game logs stored in a file, skipping blank lines
+# a last line cut off by a crash (or a truncated gzip stream) ends the file instead of raising; a broken line with games after it
+# is not a crash artifact, so it raises ValueError rather than silently dropping those games
+def read_games(path):
+    if not os.path.exists(path):
+        return
+    with open_log(path, "r") as f:
+        broken = None
+        try:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                if broken is not None:
+                    raise ValueError(f"{path}: line {broken} is not a valid game log")
+                try:
+                    game = json.loads(line)
+                except json.JSONDecodeError:
+                    broken = number
+                    continue
+                yield game
+        except (EOFError, zlib.error, gzip.BadGzipFile):
+            return
+
+# writes one game log per line; with resume=True the existing games are kept and their ids are in completed_ids
+# if the file ends with a partly written game, or its last line has no newline, the intact games are copied to a fresh file first
+# so new lines are not appended to broken data or glued onto the last game
+class GameLogWriter:
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.completed_ids = set()
+        if resume and os.path.exists(path):
+            count = 0
+            for game in read_games(path):
+                self.completed_ids.add(game["game_id"])
+                count += 1
+            lines, complete = self.scan(path)
+            if count != lines or not complete:
+                self.rewrite_intact(path)
+            self.file = open_log(path, "a")
+        else:
+            self.file = open_log(path, "w")
+
+    # (number of non-empty lines the file claims to hold, however many of them can be parsed; whether the file ends cleanly,
+    # i.e. it is empty or ends with a newline and is not a truncated gzip stream)
+    def scan(self, path):
+        count = 0
+        last = "\n"
+        with open_log(path, "r") as f:
+            try:
+                for line in f:
+                    if line.strip():
+                        count += 1
+                    last = line[-1]
+            except (EOFError, zlib.error, gzip.BadGzipFile):
+                return count + 1, False
+        return count, last == "\n"
+
+    def rewrite_intact(self, path):
+        temp_path = path + ".tmp" + (".gz" if path.endswith(".gz") else "")
+        with open_log(temp_path, "w") as f:
+            for game in read_games(path):
+                f.write(json.dumps(game) + "\n")
+        os.replace(temp_path, path)
+
+    def write(self, game_log):
+        self.file.write(json.dumps(game_log) + "\n")
+        self.file.flush()
+        self.completed_ids.add(game_log["game_id"])
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
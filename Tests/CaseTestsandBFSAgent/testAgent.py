@@ -1,18 +1,49 @@
-import json
+import argparse
 import time
-import copy
 import random
 import os
+import sys
+import importlib
 from boardState import BoardState
+from boardView import BoardView
+from gameLog import GameLogWriter, read_games
 from aStarAgent import AStarAgent
 from bfsAgent import BFSAgent
 
 # --------------------------------------------------------------
 # This is the implementation for testing the A* agent with the BFS agent.
 # Starting location for each agent are randomized in this test, total 100 games will be run 
-# The result are logged to a JSON file shortTesst.json that will be save in the same directory with this test file
+# The results are streamed to a JSON Lines file shortTest.jsonl (one game per line) that will be saved in the same directory with this test file
+# use --resume to continue an interrupted run, and an output name ending in .gz to compress the file
+# use --agent alphabeta to play GameApp's AlphaBetaAgent against the BFS agent instead (results go to alphaBetaTest.jsonl);
+# it searches with push/pop and Zobrist hashing, which the snapshot BoardState here does not have, so those games use GameApp's BoardState
 # --------------------------------------------------------------
 
+HERE = os.path.dirname(os.path.abspath(__file__))
+GAMEAPP_DIR = os.path.abspath(os.path.join(HERE, "..", "..", "GameApp"))
+
+# the directory a loaded module came from, None for built-in modules
+def module_dir(module):
+    path = getattr(module, "__file__", None)
+    return os.path.dirname(os.path.abspath(path)) if path else None
+
+# imports a GameApp module together with GameApp's own boardState, player, space, wall and pawnMoves, which share their names with
+# the snapshot copies in this directory; the snapshot modules are put back afterwards, so the rest of this file keeps using them
+def import_from_gameapp(name):
+    snapshot = {n: m for n, m in sys.modules.items() if module_dir(m) == HERE}
+    saved_path = sys.path[:]
+    for n in snapshot:
+        del sys.modules[n]
+    sys.path.insert(0, GAMEAPP_DIR)
+    try:
+        return importlib.import_module(name)
+    finally:
+        for n, m in list(sys.modules.items()):
+            if module_dir(m) == GAMEAPP_DIR:
+                del sys.modules[n]
+        sys.modules.update(snapshot)
+        sys.path[:] = saved_path
+
 # Checks if the specified player has reached their goal row.
 def is_goal_reached(board_state, player_num):
     # Added check for player existence
@@ -25,12 +56,13 @@ def is_goal_reached(board_state, player_num):
         return player.Y == 0
 
 # Run a game between A* Agent and BFS Agent with randomized starting positions
-def run_game(game_id, max_turns=100):
+# agent_classes are (player 1, player 2), each called with player_num; board_cls is the board to play on, e.g. GameApp's BoardState for AlphaBetaAgent
+def run_game(game_id, max_turns=100, agent_classes=(AStarAgent, BFSAgent), board_cls=BoardState):
     print(f"\n--- Starting Game {game_id} ---")
     start_time = time.time()
 
     # Initialize board
-    board = BoardState(size=9) # Use standard 9x9 board
+    board = board_cls(size=9) # Use standard 9x9 board
 
     # Check if players list is populated correctly by BoardState init
     if len(board.players) < 2:
@@ -56,8 +88,8 @@ def run_game(game_id, max_turns=100):
     print(f"Game {game_id}: P1 starts at (0, {start_col_p1}), P2 starts at ({board.size - 1}, {start_col_p2})")
 
     # Initialize agents
-    agent1 = AStarAgent(player_num=1)
-    agent2 = BFSAgent(player_num=2)
+    agent1 = agent_classes[0](player_num=1)
+    agent2 = agent_classes[1](player_num=2)
     agents = {1: agent1, 2: agent2}
     current_player_num = 1
 
@@ -69,7 +101,7 @@ def run_game(game_id, max_turns=100):
         "turns": 0,
         "player1_path": [(board.players[0].Y, board.players[0].X)],
         "player2_path": [(board.players[1].Y, board.players[1].X)],
-        "astar_wall_placements": [],
+        "astar_wall_placements": [], # player 1's walls, whichever agent plays player 1
         "time_seconds": 0.0
     }
 
@@ -86,9 +118,10 @@ def run_game(game_id, max_turns=100):
             break
 
         # Get action from the current agent
-        board_copy = copy.deepcopy(board)
-        action, params = agent.choose_action(board_copy)
-        del board_copy
+        # Agents get a copy-on-write view, so the real board is only copied if the agent changes it (e.g. by trying a wall)
+        board_view = BoardView(board)
+        action, params = agent.choose_action(board_view)
+        del board_view
 
         # Execute action
         action_taken = False
@@ -105,7 +138,7 @@ def run_game(game_id, max_turns=100):
                  print(f" T{game_log['turns']}.{player_turn}: P{player_turn} ({type(agent).__name__}) - Invalid move_jumpaware (out of bounds): {params['target']}")
 
         elif action == "wall":
-            if isinstance(agent, AStarAgent):
+            if agent is agent1: # only player 1's agent places walls in this test
                 c1 = params["corner1"]
                 c2 = params["corner2"]
                 direction = params["direction"]
@@ -182,47 +215,68 @@ def run_game(game_id, max_turns=100):
     return game_log
 
 if __name__ == "__main__":
-    num_games = 100
-    all_game_results = []
-
-    for i in range(1, num_games + 1):
-        result = run_game(game_id=i, max_turns=150)
-        if result is not None:
-            all_game_results.append(result)
-        else:
-            print(f"Skipping results for Game {i} due to setup error.")
-
-
-    # Log the result to a JSON file and store it in the same directory with this file
-    output_dir = os.path.dirname(os.path.abspath(__file__))
-    file_name = "shortTest.json"
-    output_filename = os.path.join(output_dir, file_name)
+    parser = argparse.ArgumentParser(description="A* agent vs BFS agent test games")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--agent", choices=["astar", "alphabeta"], default="astar", help="player 1's agent; player 2 is always the BFS agent")
+    parser.add_argument("--output", default=None, help="results file in this directory, one game per line; a .gz name is gzip-compressed "
+                                                      "(default shortTest.jsonl, or alphaBetaTest.jsonl with --agent alphabeta)")
+    parser.add_argument("--resume", action="store_true", help="keep the games already in the results file and only play the missing game ids")
+    args = parser.parse_args()
+    num_games = args.games
+
+    if args.agent == "alphabeta":
+        alpha_beta = import_from_gameapp("alphaBetaAgent")
+        agent_classes = (alpha_beta.AlphaBetaAgent, BFSAgent)
+        board_cls = alpha_beta.BoardState # GameApp's, the board the agent was written for
+        output_name = args.output or "alphaBetaTest.jsonl"
+    else:
+        agent_classes = (AStarAgent, BFSAgent)
+        board_cls = BoardState
+        output_name = args.output or "shortTest.jsonl"
 
-    print(f"\nAttempting to write results to: {output_filename}")
+    # Each game is written to the JSONL file as soon as it finishes, in the same directory with this file
+    output_filename = os.path.join(HERE, output_name)
+    print(f"\nWriting results to: {output_filename}")
 
     try:
-        with open(output_filename, 'w') as f:
-            json.dump(all_game_results, f, indent=4)
-            print(f"\nResults for {len(all_game_results)} games saved to {output_filename}")
+        with GameLogWriter(output_filename, resume=args.resume) as log:
+            if log.completed_ids:
+                print(f"Resuming: {len(log.completed_ids)} games already in {output_filename}")
+            for i in range(1, num_games + 1):
+                if i in log.completed_ids:
+                    continue
+                result = run_game(game_id=i, max_turns=150, agent_classes=agent_classes, board_cls=board_cls)
+                if result is not None:
+                    log.write(result)
+                else:
+                    print(f"Skipping results for Game {i} due to setup error.")
     except IOError as e:
         print(f"\nIOError writing results to {output_filename}: {e}")
         print("Please check the path exists and you have write permissions in that directory.")
-    except Exception as e:
-        print(f"\nAn unexpected error occurred during file writing: {e}")
-
 
-    # Print out the win rate for each agent
-    p1_wins = sum(1 for result in all_game_results if result["winner"] == 1)
-    p2_wins = sum(1 for result in all_game_results if result["winner"] == 2)
-    draws = sum(1 for result in all_game_results if result["winner"] == "Draw")
-    total_games = len(all_game_results)
 
-    p1_winrate = (p1_wins / total_games) * 100
-    p2_winrate = (p2_wins / total_games) * 100
-    draw_rate = (draws / total_games) * 100
-
-    print(f"\n--- Summary ---")
-    print(f"Total Games: {total_games}")
-    print(f"Player 1 (AStarAgent) Wins: {p1_wins} ({p1_winrate:.2f}%)")
-    print(f"Player 2 (BFSAgent) Wins: {p2_wins} ({p2_winrate:.2f}%)")
-    print(f"Draws: {draws} ({draw_rate:.2f}%)")
\ No newline at end of file
+    # Print out the win rate for each agent, reading the results back one game at a time
+    p1_wins = p2_wins = draws = total_games = 0
+    for result in read_games(output_filename):
+        if result["game_id"] > num_games:
+            continue
+        total_games += 1
+        if result["winner"] == 1:
+            p1_wins += 1
+        elif result["winner"] == 2:
+            p2_wins += 1
+        elif result["winner"] == "Draw":
+            draws += 1
+
+    if total_games == 0:
+        print("\nNo games were recorded.")
+    else:
+        p1_winrate = (p1_wins / total_games) * 100
+        p2_winrate = (p2_wins / total_games) * 100
+        draw_rate = (draws / total_games) * 100
+
+        print(f"\n--- Summary ---")
+        print(f"Total Games: {total_games}")
+        print(f"Player 1 ({agent_classes[0].__name__}) Wins: {p1_wins} ({p1_winrate:.2f}%)")
+        print(f"Player 2 ({agent_classes[1].__name__}) Wins: {p2_wins} ({p2_winrate:.2f}%)")
+        print(f"Draws: {draws} ({draw_rate:.2f}%)")
@@ -1,9 +1,9 @@
 import json
 import time
-import copy
 import random
 import os
 from boardState import BoardState
+from boardView import BoardView
 from aStarAgent import AStarAgent
 #from bfsAgent import BFSAgent
 from randomMove import RandomMoveAgent
@@ -87,9 +87,10 @@ def run_game(game_id, max_turns=100):
             break
 
         # Get action from the current agent
-        board_copy = copy.deepcopy(board)
-        action, params = agent.choose_action(board_copy)
-        del board_copy
+        # Agents get a copy-on-write view, so the real board is only copied if the agent changes it (e.g. by trying a wall)
+        board_view = BoardView(board)
+        action, params = agent.choose_action(board_view)
+        del board_view
 
         # Execute action
         action_taken = False